@@ -1,9 +1,26 @@
 """KeyCtl - A comprehensive SSH key management tool."""
-from .core.key_manager import KeyManager
-from .ui.cli import CLI
+import importlib
+import sys
 
 __version__ = "0.1.0"
 __author__ = "KeyCtl Contributors"
 __license__ = "MIT"
 
-__all__ = ["KeyManager", "CLI"] 
\ No newline at end of file
+__all__ = ["KeyManager", "CLI"]
+
+# Public name -> defining submodule, imported on first attribute access
+_LAZY_IMPORTS = {
+    "KeyManager": ".core.key_manager",
+    "CLI": ".ui.cli",
+}
+
+if sys.version_info >= (3, 7):
+    def __getattr__(name):
+        """Import re-exported classes on first access (PEP 562)."""
+        if name in _LAZY_IMPORTS:
+            module = importlib.import_module(_LAZY_IMPORTS[name], __name__)
+            return getattr(module, name)
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+else:
+    from .core.key_manager import KeyManager
+    from .ui.cli import CLI
@@ -0,0 +1,5 @@
+"""Allow running KeyCtl with ``python -m keyctl``."""
+from .ui.cli import main
+
+if __name__ == "__main__":
+    main()
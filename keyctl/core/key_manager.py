@@ -1,22 +1,105 @@
 """Core key management functionality."""
+import copy
+import filecmp
+import os
+from concurrent.futures import ThreadPoolExecutor
+import re
+import shutil
+import stat
 from pathlib import Path
 import subprocess
 from typing import Optional, Dict, List, Tuple
-from datetime import datetime
 
-from ..security.key_security import KeySecurity
-from ..utils.config import Config
+from ..security.key_security import _POOL_MIN_READS, KeySecurity
+from ..utils.config import Config, _timestamp, _write_file
 from ..utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# One "Keyword value" pair per non-comment line of an SSH config
+_SSH_CONFIG_LINE_RE = re.compile(r"(?m)^[ \t]*(?!#)(\S+)[ \t]+(.+?)[ \t]*$")
+
+# Provider -> greeting its SSH server prints on a successful "ssh -T"
+_SUCCESS_MESSAGES = {
+    "github.com": b"successfully authenticated",
+    "gitlab.com": b"Welcome to GitLab",
+    "bitbucket.org": b"logged in as",
+}
+
+def _parse_public_key(content: str) -> Tuple[Optional[str], Optional[str]]:
+    """Extract the key type and comment from public key text."""
+    key_type = comment = None
+    parts = content.strip().split()
+    if len(parts) >= 2:
+        key_type = parts[0].replace("ssh-", "")
+    if len(parts) >= 3:
+        comment = " ".join(parts[2:])
+    return key_type, comment
+
+# Public key path -> (st_mtime_ns, st_size, (type, comment)) of its last read
+_pubkey_cache: Dict[str, Tuple[int, int, Tuple[Optional[str], Optional[str]]]] = {}
+
+def _pubkey_cached(path_str: str, mtime_ns: int, size: int) -> bool:
+    """Whether the cached fields for ``path_str`` are still current."""
+    cached = _pubkey_cache.get(path_str)
+    return cached is not None and cached[0] == mtime_ns and cached[1] == size
+
+def _parse_pubkey(path_str: str, mtime_ns: int, size: int) -> Tuple[Optional[str], Optional[str]]:
+    """Read a public key file and return its (type, comment).
+
+    The result is cached per path while ``mtime_ns`` and ``size`` match, so
+    an edited file is re-read.
+    """
+    if _pubkey_cached(path_str, mtime_ns, size):
+        return _pubkey_cache[path_str][2]
+    with open(path_str) as f:
+        fields = _parse_public_key(f.read())
+    _pubkey_cache[path_str] = (mtime_ns, size, fields)
+    return fields
+
+def _copy_files(src_dir: Path, dst_dir: Path) -> int:
+    """Copy the regular files of ``src_dir`` into ``dst_dir``, keeping modes."""
+    copied = 0
+    with os.scandir(src_dir) as entries:
+        for entry in entries:
+            if entry.is_file(follow_symlinks=False):
+                shutil.copy2(entry.path, os.path.join(str(dst_dir), entry.name))
+                copied += 1
+    return copied
+
+def _backup_file(path: Path, suffix: str) -> Path:
+    """Keep the current ``path`` under an unused ``<name><suffix>`` name.
+
+    A counter is appended when a backup of the same second exists, so an
+    earlier backup is never replaced.
+    """
+    counter = 0
+    while True:
+        name = path.name + suffix if not counter else f"{path.name}{suffix}_{counter}"
+        backup_path = path.with_name(name)
+        counter += 1
+        if os.path.lexists(str(backup_path)):
+            continue
+        try:
+            # A second name for the same inode; the original stays in place
+            os.link(str(path), str(backup_path))
+        except FileExistsError:
+            continue
+        except OSError:
+            # Different filesystem or no hard link support
+            shutil.copy2(path, backup_path)
+        return backup_path
+
 class KeyManager:
     """Manages SSH key operations and lifecycle."""
 
-    def __init__(self, ssh_dir: Path = Path.home() / ".ssh"):
-        self.ssh_dir = ssh_dir
+    def __init__(self, ssh_dir: Optional[Path] = None):
+        self.ssh_dir = ssh_dir or Path.home() / ".ssh"
+        self.ssh_config_path = self.ssh_dir / "config"
         self.security = KeySecurity()
         self.config = Config()
+        # (st_mtime_ns, st_size, parsed config) of the last SSH config seen
+        self._config_cache: Optional[Tuple[int, int, Dict[str, Dict[str, str]]]] = None
 
     def create_key(self, name: str, key_type: str = "ed25519", 
                   comment: Optional[str] = None) -> Tuple[bool, str]:
@@ -27,32 +110,41 @@ class KeyManager:
             return False, "Key already exists"
             
         try:
-            cmd = ["ssh-keygen", "-t", key_type, "-f", str(key_path)]
-            if comment:
-                cmd.extend(["-C", comment])
-                
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            
-            # Set proper permissions
-            self.security.fix_permissions(key_path)
+            self._generate_key(key_path, key_type, comment)
             
             # Add to agent
             self.add_to_agent(key_path)
             
             return True, "Key created successfully"
         except subprocess.CalledProcessError as e:
-            return False, f"Key creation failed: {e.stderr}"
+            return False, f"Key creation failed: {e.stderr.decode('utf-8', 'replace')}"
         except Exception as e:
             return False, f"Error creating key: {str(e)}"
 
+    def _generate_key(self, key_path: Path, key_type: str,
+                      comment: Optional[str]) -> None:
+        """Run ssh-keygen for ``key_path`` and secure the resulting files."""
+        cmd = ["ssh-keygen", "-t", key_type, "-f", str(key_path)]
+        if comment:
+            cmd.extend(["-C", comment])
+            
+        self._run(cmd, capture_output=True, check=True)
+        
+        # Set proper permissions
+        self.security.fix_permissions(key_path)
+
+    def _run(self, cmd: List[str], **kwargs) -> subprocess.CompletedProcess:
+        """Run an external command; the single seam tests replace."""
+        return subprocess.run(cmd, **kwargs)
+
     def add_to_agent(self, key_path: Path) -> bool:
         """Add a key to the SSH agent."""
         try:
             if not self.security.check_permissions(key_path):
                 return False
                 
-            subprocess.run(["ssh-add", str(key_path)], 
-                         capture_output=True, text=True, check=True)
+            self._run(["ssh-add", str(key_path)], 
+                         capture_output=True, check=True)
             
             # Update usage statistics
             self.config.update_key_usage(key_path.name)
@@ -65,66 +157,112 @@ class KeyManager:
         """Remove a key or all keys from the SSH agent."""
         try:
             if key_path:
-                subprocess.run(["ssh-add", "-d", str(key_path)], 
-                             capture_output=True, text=True, check=True)
+                self._run(["ssh-add", "-d", str(key_path)], 
+                             capture_output=True, check=True)
             else:
-                subprocess.run(["ssh-add", "-D"], 
-                             capture_output=True, text=True, check=True)
+                self._run(["ssh-add", "-D"], 
+                             capture_output=True, check=True)
             return True
         except subprocess.CalledProcessError:
             return False
 
     def list_keys(self) -> List[Path]:
         """List all SSH keys in the SSH directory."""
-        return [key for key in self.ssh_dir.glob("id_*") 
-                if key.suffix == "" and key.name != "id_ed25519_sk"]
+        try:
+            with os.scandir(self.ssh_dir) as entries:
+                return [Path(entry.path) for entry in entries
+                        if entry.name.startswith("id_") and "." not in entry.name
+                        and entry.name != "id_ed25519_sk" and entry.is_file()]
+        except FileNotFoundError:
+            return []
 
     def validate_key(self, provider: str) -> Tuple[bool, str]:
         """Validate a key with a specific provider."""
         try:
             test_url = f"git@{provider}"
-            result = subprocess.run(["ssh", "-T", test_url], 
-                                 capture_output=True, text=True)
+            # BatchMode fails instead of prompting; the timeouts bound how
+            # long an unreachable provider can stall the check
+            result = self._run(["ssh", "-o", "BatchMode=yes",
+                                "-o", "ConnectTimeout=5",
+                                "-o", "ServerAliveInterval=2",
+                                "-T", test_url],
+                               stdin=subprocess.DEVNULL,
+                               stdout=subprocess.PIPE, stderr=subprocess.PIPE)
             
-            # Check provider-specific success messages
-            success_messages = {
-                "github.com": "successfully authenticated",
-                "gitlab.com": "Welcome to GitLab",
-                "bitbucket.org": "logged in as",
-            }
-            
-            success_msg = success_messages.get(provider, "")
+            # Match the raw bytes; output is only decoded to report a failure
+            success_msg = _SUCCESS_MESSAGES.get(provider)
             if success_msg and success_msg in result.stderr:
                 return True, "Authentication successful"
                 
-            return False, f"Authentication failed: {result.stderr}"
+            return False, f"Authentication failed: {result.stderr.decode('utf-8', 'replace')}"
         except Exception as e:
             return False, f"Validation error: {str(e)}"
 
+    def validate_keys(self, providers: List[str]) -> Dict[str, Tuple[bool, str]]:
+        """Validate keys with several providers concurrently."""
+        if not providers:
+            return {}
+            
+        # Each check blocks on its own SSH handshake, so threads overlap them
+        with ThreadPoolExecutor(max_workers=min(8, len(providers))) as executor:
+            return dict(zip(providers, executor.map(self.validate_key, providers)))
+
     def get_key_info(self, key_path: Path) -> Dict:
         """Get detailed information about a key."""
+        return self.get_keys_info([key_path])[0]
+
+    def get_keys_info(self, key_paths: List[Path]) -> List[Dict]:
+        """Get detailed information about several keys at once.
+
+        Each public key is stat'ed once; its parsed fields are cached for as
+        long as its mtime and size are unchanged, and many uncached keys are
+        read concurrently.
+        """
+        targets = []
+        for key_path in key_paths:
+            try:
+                pub_st = os.stat(f"{key_path}.pub")
+            except FileNotFoundError:
+                continue
+            targets.append((f"{key_path}.pub", pub_st.st_mtime_ns, pub_st.st_size))
+            
+        def read(target: Tuple[str, int, int]) -> Tuple[Optional[str], Optional[str]]:
+            try:
+                return _parse_pubkey(*target)
+            except Exception as e:
+                logger.error("Error reading public key: %s", e)
+                return None, None
+                
+        pub_fields = {}
+        cold = [target for target in targets if not _pubkey_cached(*target)]
+        if len(cold) >= _POOL_MIN_READS:
+            # Small reads block on I/O independently, so threads overlap them
+            with ThreadPoolExecutor(max_workers=min(8, len(cold))) as executor:
+                pub_fields.update(zip((target[0] for target in cold),
+                                      executor.map(read, cold)))
+        for target in targets:
+            if target[0] not in pub_fields:
+                pub_fields[target[0]] = read(target)
+                
+        return [self._build_key_info(key_path, os.stat(key_path),
+                                     pub_fields.get(f"{key_path}.pub", (None, None)))
+                for key_path in key_paths]
+
+    def _build_key_info(self, key_path: Path, st: os.stat_result,
+                        pub_fields: Tuple[Optional[str], Optional[str]]) -> Dict:
+        """Assemble key information from a stat result and public key fields."""
+        key_type, comment = pub_fields
         info = {
             "name": key_path.name,
-            "type": None,
-            "comment": None,
+            "type": key_type,
+            "comment": comment,
             "last_used": None,
             "expiry": None,
-            "permissions": oct(key_path.stat().st_mode)[-3:],
+            "permissions": format(st.st_mode & 0o777, "03o"),
+            # Checked against the stat above rather than a second one
+            "permissions_ok": self.security.check_permissions(key_path, st=st),
         }
         
-        # Get key type and comment from public key
-        pub_key_path = Path(f"{key_path}.pub")
-        if pub_key_path.exists():
-            try:
-                content = pub_key_path.read_text()
-                parts = content.strip().split()
-                if len(parts) >= 2:
-                    info["type"] = parts[0].replace("ssh-", "")
-                if len(parts) >= 3:
-                    info["comment"] = " ".join(parts[2:])
-            except Exception as e:
-                logger.error(f"Error reading public key: {e}")
-        
         # Get usage information
         usage = self.config.get_key_usage(key_path.name)
         if usage:
@@ -144,52 +282,120 @@ class KeyManager:
             old_info = self.get_key_info(key_path)
             
             # Create backup
-            backup_suffix = datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_path = key_path.with_suffix(f".bak_{backup_suffix}")
-            key_path.rename(backup_path)
-            
-            # Create new key with same properties
-            success, message = self.create_key(
-                key_path.name,
-                old_info["type"] or "ed25519",
-                old_info["comment"]
-            )
+            backup_path = _backup_file(key_path, f".bak_{_timestamp()}")
             
-            if not success:
-                # Restore backup if creation failed
-                backup_path.rename(key_path)
-                return False, f"Key rotation failed: {message}"
+            # Create new key with same properties beside the old one
+            new_path = key_path.with_name(key_path.name + ".rotating")
+            try:
+                self._generate_key(
+                    new_path,
+                    old_info["type"] or "ed25519",
+                    old_info["comment"]
+                )
+            except Exception as e:
+                # Nothing was replaced, so dropping the extra names is enough
+                for path in (backup_path, new_path, new_path.with_name(new_path.name + ".pub")):
+                    try:
+                        os.unlink(str(path))
+                    except FileNotFoundError:
+                        pass
+                if isinstance(e, subprocess.CalledProcessError):
+                    detail = e.stderr.decode('utf-8', 'replace')
+                else:
+                    detail = str(e)
+                return False, f"Key rotation failed: {detail}"
                 
+            os.replace(str(new_path) + ".pub", str(key_path) + ".pub")
+            os.replace(str(new_path), str(key_path))
+            self.add_to_agent(key_path)
+            
             return True, "Key rotated successfully"
         except Exception as e:
             return False, f"Error rotating key: {str(e)}"
 
+    def backup_keys(self, backup_dir: Optional[Path] = None) -> Tuple[bool, str]:
+        """Copy the files in the SSH directory into a backup directory."""
+        if backup_dir is None:
+            backup_dir = Path.home() / ".keyctl" / "backups" / f"keys_{_timestamp()}"
+        try:
+            backup_dir.mkdir(parents=True, exist_ok=True, mode=0o700)
+            copied = _copy_files(self.ssh_dir, backup_dir)
+            return True, f"Backed up {copied} files to {backup_dir}"
+        except Exception as e:
+            return False, f"Error backing up keys: {str(e)}"
+
+    def restore_keys(self, backup_dir: Path) -> Tuple[bool, str]:
+        """Copy the files of a backup directory back into the SSH directory.
+
+        An existing file that differs from its backup is first kept as
+        ``<name>.bak_<timestamp>``; nothing is overwritten without a copy.
+        """
+        try:
+            if not backup_dir.is_dir():
+                return False, f"Backup not found: {backup_dir}"
+            self.ssh_dir.mkdir(parents=True, exist_ok=True, mode=0o700)
+            suffix = f".bak_{_timestamp()}"
+            copied = kept = 0
+            with os.scandir(backup_dir) as entries:
+                for entry in entries:
+                    if not entry.is_file(follow_symlinks=False):
+                        continue
+                    target = self.ssh_dir / entry.name
+                    if os.path.lexists(str(target)):
+                        if filecmp.cmp(entry.path, str(target), shallow=False):
+                            copied += 1
+                            continue
+                        # Keep the file being replaced, then drop its name
+                        # so the copy below gets an inode of its own
+                        _backup_file(target, suffix)
+                        os.unlink(str(target))
+                        kept += 1
+                    shutil.copy2(entry.path, str(target))
+                    copied += 1
+            message = f"Restored {copied} files from {backup_dir}"
+            if kept:
+                message += f"; kept {kept} replaced files as <name>{suffix}"
+            return True, message
+        except Exception as e:
+            return False, f"Error restoring keys: {str(e)}"
+
     def get_ssh_config(self) -> Dict[str, Dict[str, str]]:
         """Get the current SSH config."""
-        config_path = Path.home() / ".ssh" / "config"
-        if not config_path.exists():
+        config_path = self.ssh_config_path
+        try:
+            st = os.stat(config_path)
+        except FileNotFoundError:
+            self._config_cache = None
             return {}
+        except OSError as e:
+            logger.error("Error reading SSH config: %s", e)
+            return {}
+            
+        # Reuse the last parse while the file is unchanged
+        cached = self._config_cache
+        if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            return copy.deepcopy(cached[2])
             
         config = {}
         current_host = None
         
         try:
             with open(config_path, "r") as f:
-                for line in f:
-                    line = line.strip()
-                    if not line or line.startswith("#"):
-                        continue
-                        
-                    if line.lower().startswith("host "):
-                        current_host = line.split()[1]
-                        config[current_host] = {}
-                    elif current_host and " " in line:
-                        key, value = line.split(" ", 1)
-                        config[current_host][key] = value
-                        
-            return config
+                text = f.read()
+                
+            for match in _SSH_CONFIG_LINE_RE.finditer(text):
+                key, value = match.groups()
+                # Length check first so most keywords skip the lower() copy
+                if len(key) == 4 and key.lower() == "host":
+                    current_host = value.split()[0]
+                    config[current_host] = {}
+                elif current_host:
+                    config[current_host][key] = value
+                    
+            self._config_cache = (st.st_mtime_ns, st.st_size, config)
+            return copy.deepcopy(config)
         except Exception as e:
-            logger.error(f"Error reading SSH config: {e}")
+            logger.error("Error reading SSH config: %s", e)
             return {}
             
     def update_ssh_config(
@@ -200,7 +406,7 @@ class KeyManager:
         port: Optional[int] = None
     ) -> Tuple[bool, str]:
         """Update SSH config for a host."""
-        config_path = Path.home() / ".ssh" / "config"
+        config_path = self.ssh_config_path
         config_dir = config_path.parent
         
         try:
@@ -222,12 +428,7 @@ class KeyManager:
                 config[host]["Port"] = str(port)
                 
             # Write updated config
-            with open(config_path, "w") as f:
-                for host_name, settings in config.items():
-                    f.write(f"Host {host_name}\n")
-                    for key, value in settings.items():
-                        f.write(f"    {key} {value}\n")
-                    f.write("\n")
+            self._write_ssh_config(config_path, config)
                     
             return True, f"Updated SSH config for {host}"
         except Exception as e:
@@ -237,7 +438,7 @@ class KeyManager:
             
     def remove_ssh_config(self, host: str) -> Tuple[bool, str]:
         """Remove host from SSH config."""
-        config_path = Path.home() / ".ssh" / "config"
+        config_path = self.ssh_config_path
         
         try:
             # Read existing config
@@ -248,12 +449,7 @@ class KeyManager:
                 del config[host]
                 
                 # Write updated config
-                with open(config_path, "w") as f:
-                    for host_name, settings in config.items():
-                        f.write(f"Host {host_name}\n")
-                        for key, value in settings.items():
-                            f.write(f"    {key} {value}\n")
-                        f.write("\n")
+                self._write_ssh_config(config_path, config)
                         
                 return True, f"Removed {host} from SSH config"
             else:
@@ -262,4 +458,32 @@ class KeyManager:
         except Exception as e:
             error_msg = f"Error removing host from SSH config: {e}"
             logger.error(error_msg)
-            return False, error_msg 
\ No newline at end of file
+            return False, error_msg 
+
+    def _write_ssh_config(self, config_path: Path, config: Dict[str, Dict[str, str]]) -> None:
+        """Serialize an SSH config mapping and write it in a single call.
+
+        The file is written next to the config and renamed into place, so
+        readers never see a partially written config. A symlinked config
+        (e.g. from a dotfiles repository) is followed, and the file it
+        points to is replaced with its permission bits kept.
+        """
+        lines = []
+        for host_name, settings in config.items():
+            lines.append(f"Host {host_name}\n")
+            lines.extend(f"    {key} {value}\n" for key, value in settings.items())
+            lines.append("\n")
+            
+        target = os.path.realpath(str(config_path))
+        try:
+            mode = stat.S_IMODE(os.stat(target).st_mode)
+        except FileNotFoundError:
+            mode = 0o600
+        _write_file(Path(target), "".join(lines).encode("utf-8"), mode)
+        
+        # Write through so the next read does not re-parse
+        try:
+            st = os.stat(config_path)
+            self._config_cache = (st.st_mtime_ns, st.st_size, copy.deepcopy(config))
+        except OSError:
+            self._config_cache = None
@@ -1,33 +1,104 @@
 """Security-related functionality for SSH key management."""
 import os
+import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, Dict
+from typing import TYPE_CHECKING, Optional, Dict, List, Tuple
 import stat
-from cryptography.fernet import Fernet
+
+if TYPE_CHECKING:
+    from cryptography.fernet import Fernet
 
 from ..utils.logger import get_logger, SecurityError
 from ..utils.validation import validate_ssh_key_format
 
 logger = get_logger(__name__)
 
+# Bytes of random data drawn per write when overwriting a deleted key
+_OVERWRITE_CHUNK_SIZE = 64 * 1024
+
+# Key files are read through a thread pool only from this many on; for
+# fewer, starting the pool costs more than the reads it overlaps
+_POOL_MIN_READS = 8
+
+# Key name prefixes accepted by validate_key_name
+_VALID_PREFIXES = ("id_ed25519", "id_rsa", "id_ecdsa", "id_dsa")
+
+# Parent-directory references or path separators in a key name
+_PATH_TRAVERSAL_RE = re.compile(r"\.\.|[\\/]")
+
+# Strength recommendation per public key algorithm (None: no concerns)
+_STRENGTH_RECOMMENDATIONS = {
+    "ssh-ed25519": None,
+    "ssh-rsa": "RSA keys are being phased out, consider using Ed25519",
+    "ssh-dss": "DSA keys are deprecated and insecure",
+}
+
+# Key sizes of algorithms whose size is implied by the algorithm name
+_FIXED_KEY_BITS = {
+    "ssh-ed25519": "256",
+    "ecdsa-sha2-nistp256": "256",
+    "ecdsa-sha2-nistp384": "384",
+    "ecdsa-sha2-nistp521": "521",
+}
+
+def _strength_recommendation(key_type: str) -> Optional[str]:
+    """Return the recommendation for a public key algorithm, if any."""
+    if key_type in _STRENGTH_RECOMMENDATIONS:
+        return _STRENGTH_RECOMMENDATIONS[key_type]
+    if key_type.startswith("ecdsa"):
+        return "ECDSA keys have potential security concerns"
+    return None
+
 class KeySecurity:
     """Handles security-related operations for SSH keys."""
 
+    # Loaded encryption keys shared across instances: key_file -> (st_mtime_ns, key, cipher)
+    _KEY_CACHE: Dict[Path, Tuple[int, bytes, "Fernet"]] = {}
+
     def __init__(self):
         self.private_key_mode = 0o600  # -rw-------
         self.public_key_mode = 0o644   # -rw-r--r--
         self.dir_mode = 0o700          # drwx------
         self.key_file = Path.home() / '.keyctl' / '.key'
-        self._load_or_create_key()
+        self.key: Optional[bytes] = None
+        self._cipher_suite: Optional["Fernet"] = None
+
+    @property
+    def cipher_suite(self) -> "Fernet":
+        """Cipher for key encryption, loaded on first use."""
+        if self._cipher_suite is None:
+            self._load_or_create_key()
+        return self._cipher_suite
 
     def _load_or_create_key(self) -> None:
         """Load or create encryption key."""
-        if self.key_file.exists():
-            self.key = self.key_file.read_bytes()
-        else:
+        # Deferred so commands that never encrypt skip loading cryptography
+        from cryptography.fernet import Fernet
+
+        cached = self._KEY_CACHE.get(self.key_file)
+        try:
+            with open(self.key_file, 'rb') as f:
+                st = os.fstat(f.fileno())
+                if cached and cached[0] == st.st_mtime_ns:
+                    self.key, self._cipher_suite = cached[1], cached[2]
+                    return
+                self.key = f.read()
+        except FileNotFoundError:
+            self.key_file.parent.mkdir(parents=True, exist_ok=True, mode=self.dir_mode)
             self.key = Fernet.generate_key()
-            self.key_file.write_bytes(self.key)
-        self.cipher_suite = Fernet(self.key)
+            try:
+                # Create with owner-only permissions; never clobber a concurrent writer
+                fd = os.open(self.key_file, os.O_WRONLY | os.O_CREAT | os.O_EXCL,
+                             self.private_key_mode)
+            except FileExistsError:
+                self._load_or_create_key()
+                return
+            with os.fdopen(fd, 'wb') as f:
+                f.write(self.key)
+            st = os.stat(self.key_file)
+        self._cipher_suite = Fernet(self.key)
+        self._KEY_CACHE[self.key_file] = (st.st_mtime_ns, self.key, self._cipher_suite)
 
     def encrypt_key(self, key_path: Path) -> bytes:
         """Encrypt an SSH key."""
@@ -49,60 +120,80 @@ class KeySecurity:
         """Check SSH key strength."""
         try:
             validate_ssh_key_format(key_path)
-            # Implementation for key strength checking
+            
+            # The algorithm is the first field of the public key
+            try:
+                fields = Path(f"{key_path}.pub").read_text().split(None, 1)
+            except FileNotFoundError:
+                fields = []
+            key_type = fields[0] if fields else "unknown"
+            
+            recommendation = _strength_recommendation(key_type)
+            if fields:
+                strength = "weak" if recommendation else "strong"
+            else:
+                strength = "unknown"
             return {
-                "type": "ed25519",
-                "bits": "256",
-                "strength": "strong",
-                "recommendations": []
+                "type": key_type.replace("ssh-", ""),
+                "bits": _FIXED_KEY_BITS.get(key_type, "unknown"),
+                "strength": strength,
+                "recommendations": [recommendation] if recommendation else []
             }
         except Exception as e:
             raise SecurityError(f"Error checking key strength: {e}")
 
-    def check_permissions(self, key_path: Path) -> bool:
-        """Check if key file has correct permissions."""
-        try:
-            current_mode = stat.S_IMODE(os.stat(key_path).st_mode)
-            expected_mode = (self.public_key_mode 
-                           if key_path.suffix == '.pub' 
-                           else self.private_key_mode)
+    def check_keys_strength(self, key_paths: List[Path]) -> List[Dict[str, str]]:
+        """Check the strength of several keys, reading many concurrently."""
+        if len(key_paths) < _POOL_MIN_READS:
+            return [self.check_key_strength(key_path) for key_path in key_paths]
             
-            return current_mode == expected_mode
+        # Each check is a couple of small reads that block independently
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            return list(executor.map(self.check_key_strength, key_paths))
+
+    def check_permissions(self, key_path: Path,
+                          st: Optional[os.stat_result] = None) -> bool:
+        """Check if key file has correct permissions.
+
+        A stat result already taken by the caller can be passed as ``st``
+        to avoid statting the file again.
+        """
+        try:
+            if st is None:
+                st = os.stat(key_path)
+            expected_mode = (self.public_key_mode if key_path.suffix == '.pub'
+                             else self.private_key_mode)
+            return stat.S_IMODE(st.st_mode) == expected_mode
         except Exception as e:
-            logger.error(f"Error checking permissions for {key_path}: {e}")
+            logger.error("Error checking permissions for %s: %s", key_path, e)
             return False
 
     def fix_permissions(self, key_path: Path) -> bool:
         """Set correct permissions for key files."""
         try:
-            # Fix private key permissions
-            if key_path.exists():
-                os.chmod(key_path, self.private_key_mode)
-            
-            # Fix public key permissions if it exists
-            pub_key = Path(f"{key_path}.pub")
-            if pub_key.exists():
-                os.chmod(pub_key, self.public_key_mode)
-            
-            # Fix SSH directory permissions
-            ssh_dir = key_path.parent
-            if ssh_dir.exists():
-                os.chmod(ssh_dir, self.dir_mode)
+            # chmod directly and skip what is missing, rather than stat
+            # each path first to see whether it exists
+            for path, mode in ((key_path, self.private_key_mode),
+                               (f"{key_path}.pub", self.public_key_mode),
+                               (key_path.parent, self.dir_mode)):
+                try:
+                    os.chmod(path, mode)
+                except FileNotFoundError:
+                    pass
                 
             return True
         except Exception as e:
-            logger.error(f"Error fixing permissions for {key_path}: {e}")
+            logger.error("Error fixing permissions for %s: %s", key_path, e)
             return False
 
     def validate_key_name(self, name: str) -> bool:
         """Validate that a key name is safe and follows conventions."""
         # Check for path traversal attempts
-        if ".." in name or "/" in name or "\\" in name:
+        if _PATH_TRAVERSAL_RE.search(name):
             return False
             
         # Check for valid key name pattern
-        valid_prefixes = ["id_ed25519", "id_rsa", "id_ecdsa", "id_dsa"]
-        return any(name.startswith(prefix) for prefix in valid_prefixes)
+        return name.startswith(_VALID_PREFIXES)
 
     def secure_key_deletion(self, key_path: Path) -> bool:
         """Securely delete a key file by overwriting it before removal."""
@@ -110,12 +201,21 @@ class KeySecurity:
             if not key_path.exists():
                 return True
                 
-            # Overwrite file with random data
-            size = key_path.stat().st_size
+            # Overwrite file with random data, one bounded chunk at a time
+            remaining = key_path.stat().st_size
             with open(key_path, 'wb') as f:
-                f.write(os.urandom(size))
+                while remaining:
+                    n = min(_OVERWRITE_CHUNK_SIZE, remaining)
+                    f.write(os.urandom(n))
+                    remaining -= n
                 f.flush()
                 os.fsync(f.fileno())
+                
+                # Drop the overwritten pages from the page cache
+                try:
+                    os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+                except (AttributeError, OSError):
+                    pass
             
             # Remove the file
             key_path.unlink()
@@ -127,5 +227,5 @@ class KeySecurity:
                 
             return True
         except Exception as e:
-            logger.error(f"Error securely deleting {key_path}: {e}")
+            logger.error("Error securely deleting %s: %s", key_path, e)
             return False 
\ No newline at end of file
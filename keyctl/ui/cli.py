@@ -1,455 +1,806 @@
 """Command-line interface for KeyCtl."""
 import argparse
+from functools import lru_cache
+import os
+import re
 import sys
 from pathlib import Path
-from typing import List, Optional
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 
-from ..core.key_manager import KeyManager
-from ..utils.logger import get_logger
-from ..utils.config import Config
+from .. import __version__
+from ..utils.logger import ValidationError, configure_logging, get_logger
+
+if TYPE_CHECKING:
+    from ..core.key_manager import KeyManager
+    from ..utils.config import Config
 
 logger = get_logger(__name__)
 
+# "owner/repo" shorthand (or "group/subgroup/repo"): no scheme, host or "@"
+_SHORTHAND_RE = re.compile(r"^[^/@:]+(?:/[^/@:]+)+$")
+
+# Accepted --type and provider values, shared by argparse and _FAST_SCHEMAS
+_KEY_TYPES = ("ed25519", "rsa", "ecdsa")
+_PROVIDERS = ("github.com", "gitlab.com", "bitbucket.org")
+
+
+class _CachedFormatterParser(argparse.ArgumentParser):
+    """ArgumentParser that reuses one formatter while arguments are added.
+
+    ``add_argument`` builds a throwaway formatter (twice on Python 3.14+,
+    each probing the environment for colour support) just to validate
+    metavars and help strings. That use is read-only, so a single instance
+    is shared; help and usage output still get a fresh formatter.
+    """
+
+    _adding_argument = False
+    _argument_formatter = None
+
+    def add_argument(self, *args, **kwargs):
+        self._adding_argument = True
+        try:
+            return super().add_argument(*args, **kwargs)
+        finally:
+            self._adding_argument = False
+
+    def _get_formatter(self):
+        if not self._adding_argument:
+            return super()._get_formatter()
+        if self._argument_formatter is None:
+            self._argument_formatter = super()._get_formatter()
+        return self._argument_formatter
+
+
+def _positive_int(value: str) -> int:
+    """argparse type for a count of days, which must be at least 1."""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {value!r}")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, got {value}")
+    return number
+
+def _add_create_args(create_parser: argparse.ArgumentParser) -> None:
+    """Add arguments for the create command."""
+    create_parser.add_argument("name", help="Name of the key")
+    create_parser.add_argument(
+        "--type", "-t",
+        choices=_KEY_TYPES,
+        default="ed25519",
+        help="Key type (default: ed25519)"
+    )
+    create_parser.add_argument(
+        "--comment", "-c",
+        help="Comment for the key"
+    )
+    create_parser.add_argument(
+        "--expiry", "-e",
+        type=_positive_int,
+        help="Days until key expiration"
+    )
+
+def _add_list_args(list_parser: argparse.ArgumentParser) -> None:
+    """Add arguments for the list command."""
+    list_parser.add_argument(
+        "--show-details", "-d",
+        action="store_true",
+        help="Show detailed information about each key"
+    )
+
+def _add_add_args(add_parser: argparse.ArgumentParser) -> None:
+    """Add arguments for the add command."""
+    add_parser.add_argument("name", help="Name of the key to add")
+    add_parser.add_argument(
+        "--timeout", "-t",
+        type=int,
+        help="Minutes until key is automatically removed"
+    )
+
+def _add_remove_args(remove_parser: argparse.ArgumentParser) -> None:
+    """Add arguments for the remove command."""
+    remove_parser.add_argument(
+        "name",
+        nargs="?",
+        help="Name of the key to remove (omit to remove all)"
+    )
+
+def _add_validate_args(validate_parser: argparse.ArgumentParser) -> None:
+    """Add arguments for the validate command."""
+    validate_parser.add_argument(
+        "provider",
+        nargs="+",
+        choices=_PROVIDERS,
+        help="Provider(s) to validate against, checked concurrently"
+    )
+
+def _add_rotate_args(rotate_parser: argparse.ArgumentParser) -> None:
+    """Add arguments for the rotate command."""
+    rotate_parser.add_argument("name", help="Name of the key to rotate")
+
+def _add_backup_args(backup_parser: argparse.ArgumentParser) -> None:
+    """Add arguments for the backup command."""
+    backup_parser.add_argument(
+        "--dir", "-d",
+        help="Backup directory (default: ~/.keyctl/backups/keys_<timestamp>)"
+    )
+
+def _add_restore_args(restore_parser: argparse.ArgumentParser) -> None:
+    """Add arguments for the restore command."""
+    restore_parser.add_argument(
+        "backup_path",
+        help="Path to backup directory"
+    )
+
+def _add_analyze_args(analyze_parser: argparse.ArgumentParser) -> None:
+    """Add arguments for the analyze command."""
+    analyze_parser.add_argument(
+        "name",
+        nargs="?",
+        help="Name of the key to analyze (omit to analyze all)"
+    )
+
+def _add_config_args(config_parser: argparse.ArgumentParser) -> None:
+    """Add the SSH config management subcommands."""
+    config_subparsers = config_parser.add_subparsers(dest="config_command")
+    
+    # List hosts
+    config_subparsers.add_parser("list", help="List SSH config hosts")
+    
+    # Add/edit host
+    config_host_parser = config_subparsers.add_parser("host", help="Add/edit host")
+    config_host_parser.add_argument("host", help="Host pattern")
+    config_host_parser.add_argument("--key", help="Identity file for host")
+    config_host_parser.add_argument("--user", help="Username for host")
+    config_host_parser.add_argument("--port", type=int, help="Port for host")
+    
+    # Remove host
+    config_remove_parser = config_subparsers.add_parser("remove", help="Remove host")
+    config_remove_parser.add_argument("host", help="Host to remove")
+
+def _add_stats_args(stats_parser: argparse.ArgumentParser) -> None:
+    """Add arguments for the stats command."""
+    stats_parser.add_argument(
+        "name",
+        nargs="?",
+        help="Name of the key to show stats for (omit for all)"
+    )
+
+def _add_expire_args(expire_parser: argparse.ArgumentParser) -> None:
+    """Add the expiration management subcommands."""
+    expire_subparsers = expire_parser.add_subparsers(dest="expire_command")
+    
+    # Set expiration
+    expire_set_parser = expire_subparsers.add_parser("set", help="Set key expiration")
+    expire_set_parser.add_argument("name", help="Name of the key")
+    expire_set_parser.add_argument("days", type=_positive_int, help="Days until expiration")
+    
+    # Remove expiration
+    expire_remove_parser = expire_subparsers.add_parser("remove", help="Remove key expiration")
+    expire_remove_parser.add_argument("name", help="Name of the key")
+    
+    # Check expiration
+    expire_subparsers.add_parser("check", help="Check key expirations")
+
+def _add_repo_args(repo_parser: argparse.ArgumentParser) -> None:
+    """Add the repository management subcommands."""
+    repo_subparsers = repo_parser.add_subparsers(dest="repo_command")
+    
+    # Clone repository
+    clone_parser = repo_subparsers.add_parser("clone", help="Clone a repository with specific key")
+    clone_parser.add_argument("url", help="Repository URL or shorthand (e.g., owner/repo)")
+    clone_parser.add_argument("--key", help="SSH key to use")
+    clone_parser.add_argument("--provider", default="github.com", 
+                            choices=_PROVIDERS,
+                            help="Git provider (default: github.com)")
+    clone_parser.add_argument("--path", help="Local path to clone to")
+    clone_parser.add_argument("--git-email", help="Configure user.email for the repository")
+    clone_parser.add_argument("--git-name", help="Configure user.name for the repository")
+    
+    # Link key to repository
+    link_parser = repo_subparsers.add_parser("link", help="Link SSH key to repository")
+    link_parser.add_argument("repo_path", help="Local repository path")
+    link_parser.add_argument("key_name", help="SSH key name")
+    
+    # List repository links
+    list_links_parser = repo_subparsers.add_parser("list-links", help="List repository-key links")
+    list_links_parser.add_argument("--repo", help="Filter by repository path")
+    list_links_parser.add_argument("--key", help="Filter by key name")
+
+# Top-level commands in help order: name -> (help text, argument builder)
+_COMMANDS = {
+    "create": ("Create a new SSH key", _add_create_args),
+    "list": ("List all SSH keys", _add_list_args),
+    "add": ("Add key to SSH agent", _add_add_args),
+    "remove": ("Remove key from SSH agent", _add_remove_args),
+    "validate": ("Validate key with provider", _add_validate_args),
+    "rotate": ("Rotate an SSH key", _add_rotate_args),
+    "backup": ("Backup SSH keys", _add_backup_args),
+    "restore": ("Restore SSH keys from backup", _add_restore_args),
+    "analyze": ("Analyze key strength", _add_analyze_args),
+    "config": ("Manage SSH config", _add_config_args),
+    "stats": ("View key statistics", _add_stats_args),
+    "expire": ("Manage key expiration", _add_expire_args),
+    "repo": ("Repository management", _add_repo_args),
+}
+
+@lru_cache(maxsize=None)
+def _build_parser(command: Optional[str]) -> Tuple[argparse.ArgumentParser,
+                                                  Dict[str, argparse.ArgumentParser]]:
+    """Build the parser, with arguments for ``command`` only (or all if None).
+
+    Returns the parser and the subcommand parsers that received arguments.
+    """
+    # Named explicitly: under "python -m keyctl" argv[0] is __main__.py
+    parser = _CachedFormatterParser(
+        prog="keyctl",
+        description="KeyCtl - A comprehensive SSH key management tool",
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("-v", "--version", action="version", version=f"keyctl {__version__}")
+    
+    subparsers = parser.add_subparsers(dest="command", help="Available commands")
+    
+    command_parsers = {}
+    for name, (help_text, add_arguments) in _COMMANDS.items():
+        command_parser = subparsers.add_parser(name, help=help_text)
+        if command is None or command == name:
+            add_arguments(command_parser)
+            command_parsers[name] = command_parser
+    
+    return parser, command_parsers
+
+def _write_lines(lines: List[str]) -> None:
+    """Write output lines to stdout in a single call."""
+    if lines:
+        sys.stdout.write("\n".join(lines) + "\n")
+
+def _sniff_subcommand(argv: List[str]) -> Optional[str]:
+    """Return the command named by argv, if it names a known one."""
+    for arg in argv:
+        if not arg.startswith("-"):
+            return arg if arg in _COMMANDS else None
+    return None
+
+# Argument schemas for the flat commands, mirroring their argparse builders:
+# command -> (positionals, options, defaults) where positionals are
+# (dest, required, type, choices) and options map each flag to
+# (dest, type, choices); a type of None marks a store_true flag.
+_FAST_SCHEMAS = {
+    "create": (
+        [("name", True, str, None)],
+        {
+            "--type": ("type", str, _KEY_TYPES),
+            "-t": ("type", str, _KEY_TYPES),
+            "--comment": ("comment", str, None),
+            "-c": ("comment", str, None),
+            "--expiry": ("expiry", _positive_int, None),
+            "-e": ("expiry", _positive_int, None),
+        },
+        {"type": "ed25519", "comment": None, "expiry": None},
+    ),
+    "list": (
+        [],
+        {
+            "--show-details": ("show_details", None, None),
+            "-d": ("show_details", None, None),
+        },
+        {"show_details": False},
+    ),
+    "add": (
+        [("name", True, str, None)],
+        {
+            "--timeout": ("timeout", int, None),
+            "-t": ("timeout", int, None),
+        },
+        {"timeout": None},
+    ),
+    "remove": ([("name", False, str, None)], {}, {}),
+    "rotate": ([("name", True, str, None)], {}, {}),
+    "backup": (
+        [],
+        {
+            "--dir": ("dir", str, None),
+            "-d": ("dir", str, None),
+        },
+        {"dir": None},
+    ),
+    "restore": ([("backup_path", True, str, None)], {}, {}),
+    "analyze": ([("name", False, str, None)], {}, {}),
+    "stats": ([("name", False, str, None)], {}, {}),
+}
+
+def _fast_parse(argv: List[str]) -> Optional[argparse.Namespace]:
+    """Parse a simple flat-command argv without argparse.
+
+    Returns None for anything outside the schemas (help, abbreviations,
+    bad values, missing arguments) so argparse can handle or report it.
+    """
+    if not argv or argv[0] not in _FAST_SCHEMAS:
+        return None
+    positionals, options, defaults = _FAST_SCHEMAS[argv[0]]
+    values = dict(defaults)
+    values.update((dest, None) for dest, _, _, _ in positionals)
+    filled = 0
+    
+    args = iter(argv[1:])
+    for arg in args:
+        if arg.startswith("-") and arg != "-":
+            flag, sep, value = arg.partition("=")
+            if flag not in options:
+                return None
+            dest, convert, choices = options[flag]
+            if convert is None:
+                if sep:
+                    return None
+                values[dest] = True
+                continue
+            if not sep:
+                value = next(args, None)
+                if value is None or value.startswith("-"):
+                    return None
+        else:
+            if filled == len(positionals):
+                return None
+            dest, _, convert, choices = positionals[filled]
+            filled += 1
+            value = arg
+        try:
+            value = convert(value)
+        except (ValueError, argparse.ArgumentTypeError):
+            return None
+        if choices is not None and value not in choices:
+            return None
+        values[dest] = value
+    
+    if any(required for _, required, _, _ in positionals[filled:]):
+        return None
+    return argparse.Namespace(command=argv[0], **values)
+
+# Nested subcommand -> CLI handler method name, for config, expire and repo
+_CONFIG_HANDLERS = {
+    "list": "_cmd_config_list",
+    "host": "_cmd_config_host",
+    "remove": "_cmd_config_remove",
+}
+_EXPIRE_HANDLERS = {
+    "set": "_cmd_expire_set",
+    "remove": "_cmd_expire_remove",
+    "check": "_cmd_expire_check",
+}
+_REPO_HANDLERS = {
+    "clone": "_cmd_repo_clone",
+    "link": "_cmd_repo_link",
+    "list-links": "_cmd_repo_list_links",
+}
+
 class CLI:
     """Command-line interface for the KeyCtl."""
 
     def __init__(self):
-        self.key_manager = KeyManager()
-        self.config = Config()
-
-    def create_parser(self) -> argparse.ArgumentParser:
-        """Create and configure the argument parser."""
-        parser = argparse.ArgumentParser(
-            description="KeyCtl - A comprehensive SSH key management tool",
-            formatter_class=argparse.RawDescriptionHelpFormatter
-        )
-        
-        subparsers = parser.add_subparsers(dest="command", help="Available commands")
-        
-        # Create key command
-        create_parser = subparsers.add_parser("create", help="Create a new SSH key")
-        create_parser.add_argument("name", help="Name of the key")
-        create_parser.add_argument(
-            "--type", "-t",
-            choices=["ed25519", "rsa", "ecdsa"],
-            default="ed25519",
-            help="Key type (default: ed25519)"
-        )
-        create_parser.add_argument(
-            "--comment", "-c",
-            help="Comment for the key"
-        )
-        create_parser.add_argument(
-            "--expiry", "-e",
-            type=int,
-            help="Days until key expiration"
-        )
-        
-        # List keys command
-        list_parser = subparsers.add_parser("list", help="List all SSH keys")
-        list_parser.add_argument(
-            "--show-details", "-d",
-            action="store_true",
-            help="Show detailed information about each key"
-        )
-        
-        # Add to agent command
-        add_parser = subparsers.add_parser("add", help="Add key to SSH agent")
-        add_parser.add_argument("name", help="Name of the key to add")
-        add_parser.add_argument(
-            "--timeout", "-t",
-            type=int,
-            help="Minutes until key is automatically removed"
-        )
-        
-        # Remove from agent command
-        remove_parser = subparsers.add_parser("remove", help="Remove key from SSH agent")
-        remove_parser.add_argument(
-            "name",
-            nargs="?",
-            help="Name of the key to remove (omit to remove all)"
-        )
-        
-        # Validate key command
-        validate_parser = subparsers.add_parser("validate", help="Validate key with provider")
-        validate_parser.add_argument(
-            "provider",
-            choices=["github.com", "gitlab.com", "bitbucket.org"],
-            help="Provider to validate against"
-        )
-        
-        # Rotate key command
-        rotate_parser = subparsers.add_parser("rotate", help="Rotate an SSH key")
-        rotate_parser.add_argument("name", help="Name of the key to rotate")
-        
-        # Backup keys command
-        backup_parser = subparsers.add_parser("backup", help="Backup SSH keys")
-        backup_parser.add_argument(
-            "--dir", "-d",
-            help="Backup directory (default: ~/ssh_backup)"
-        )
-        
-        # Restore keys command
-        restore_parser = subparsers.add_parser("restore", help="Restore SSH keys from backup")
-        restore_parser.add_argument(
-            "backup_path",
-            help="Path to backup directory"
-        )
-        
-        # Analyze key strength
-        analyze_parser = subparsers.add_parser("analyze", help="Analyze key strength")
-        analyze_parser.add_argument(
-            "name",
-            nargs="?",
-            help="Name of the key to analyze (omit to analyze all)"
-        )
-        
-        # SSH config management
-        config_parser = subparsers.add_parser("config", help="Manage SSH config")
-        config_subparsers = config_parser.add_subparsers(dest="config_command")
-        
-        # List hosts
-        config_subparsers.add_parser("list", help="List SSH config hosts")
-        
-        # Add/edit host
-        config_host_parser = config_subparsers.add_parser("host", help="Add/edit host")
-        config_host_parser.add_argument("host", help="Host pattern")
-        config_host_parser.add_argument("--key", help="Identity file for host")
-        config_host_parser.add_argument("--user", help="Username for host")
-        config_host_parser.add_argument("--port", type=int, help="Port for host")
-        
-        # Remove host
-        config_remove_parser = config_subparsers.add_parser("remove", help="Remove host")
-        config_remove_parser.add_argument("host", help="Host to remove")
-        
-        # Statistics command
-        stats_parser = subparsers.add_parser("stats", help="View key statistics")
-        stats_parser.add_argument(
-            "name",
-            nargs="?",
-            help="Name of the key to show stats for (omit for all)"
-        )
-        
-        # Expiration management
-        expire_parser = subparsers.add_parser("expire", help="Manage key expiration")
-        expire_subparsers = expire_parser.add_subparsers(dest="expire_command")
-        
-        # Set expiration
-        expire_set_parser = expire_subparsers.add_parser("set", help="Set key expiration")
-        expire_set_parser.add_argument("name", help="Name of the key")
-        expire_set_parser.add_argument("days", type=int, help="Days until expiration")
-        
-        # Remove expiration
-        expire_remove_parser = expire_subparsers.add_parser("remove", help="Remove key expiration")
-        expire_remove_parser.add_argument("name", help="Name of the key")
-        
-        # Check expiration
-        expire_subparsers.add_parser("check", help="Check key expirations")
-        
-        # Repository management
-        repo_parser = subparsers.add_parser("repo", help="Repository management")
-        repo_subparsers = repo_parser.add_subparsers(dest="repo_command")
-        
-        # Clone repository
-        clone_parser = repo_subparsers.add_parser("clone", help="Clone a repository with specific key")
-        clone_parser.add_argument("url", help="Repository URL or shorthand (e.g., owner/repo)")
-        clone_parser.add_argument("--key", help="SSH key to use")
-        clone_parser.add_argument("--provider", default="github.com", 
-                                choices=["github.com", "gitlab.com", "bitbucket.org"],
-                                help="Git provider (default: github.com)")
-        clone_parser.add_argument("--path", help="Local path to clone to")
-        clone_parser.add_argument("--git-email", help="Configure user.email for the repository")
-        clone_parser.add_argument("--git-name", help="Configure user.name for the repository")
-        
-        # Link key to repository
-        link_parser = repo_subparsers.add_parser("link", help="Link SSH key to repository")
-        link_parser.add_argument("repo_path", help="Local repository path")
-        link_parser.add_argument("key_name", help="SSH key name")
-        
-        # List repository links
-        list_links_parser = repo_subparsers.add_parser("list-links", help="List repository-key links")
-        list_links_parser.add_argument("--repo", help="Filter by repository path")
-        list_links_parser.add_argument("--key", help="Filter by key name")
-        
+        # Created on first use so help and argument errors skip all setup I/O
+        self._key_manager: Optional["KeyManager"] = None
+        self._config: Optional["Config"] = None
+        self._ssh_dir: Optional[Path] = None
+        # Subcommand parsers from the last create_parser() call, for sub-help
+        self._command_parsers: Dict[str, argparse.ArgumentParser] = {}
+
+    @property
+    def key_manager(self) -> "KeyManager":
+        """Key manager, created on first access."""
+        if self._key_manager is None:
+            from ..core.key_manager import KeyManager
+            self._key_manager = KeyManager(ssh_dir=self.ssh_dir)
+        return self._key_manager
+
+    @property
+    def ssh_dir(self) -> Path:
+        """User's SSH directory, resolved once."""
+        if self._ssh_dir is None:
+            self._ssh_dir = Path(os.path.expanduser("~/.ssh"))
+        return self._ssh_dir
+
+    @property
+    def config(self) -> "Config":
+        """Configuration store, created on first access."""
+        if self._config is None:
+            from ..utils.config import Config
+            self._config = Config()
+        return self._config
+
+    def create_parser(self, argv: Optional[List[str]] = None) -> argparse.ArgumentParser:
+        """Create and configure the argument parser.
+
+        When ``argv`` names a known command, only that command's arguments
+        are built; the other commands are registered without arguments so
+        they still appear in the help output. Parsers are built once per
+        process and reused.
+        """
+        command = _sniff_subcommand(argv) if argv is not None else None
+        parser, self._command_parsers = _build_parser(command)
         return parser
 
+    # Top-level command -> handler method name
+    _HANDLERS = {
+        "create": "_cmd_create",
+        "list": "_cmd_list",
+        "add": "_cmd_add",
+        "remove": "_cmd_remove",
+        "validate": "_cmd_validate",
+        "rotate": "_cmd_rotate",
+        "backup": "_cmd_backup",
+        "restore": "_cmd_restore",
+        "analyze": "_cmd_analyze",
+        "config": "_cmd_config",
+        "stats": "_cmd_stats",
+        "expire": "_cmd_expire",
+        "repo": "_cmd_repo",
+    }
+
     def run(self, args: Optional[List[str]] = None) -> int:
         """Run the CLI with the given arguments."""
-        parser = self.create_parser()
-        parsed_args = parser.parse_args(args)
+        argv = args if args is not None else sys.argv[1:]
         
-        if not parsed_args.command:
-            parser.print_help()
+        # Answer the common no-op invocations without building a parser
+        if not argv:
+            self._print_synopsis()
             return 1
+        if argv[0] in ("-v", "--version"):
+            print(f"keyctl {__version__}")
+            return 0
             
+        # Simple flat commands skip building the argparse tree entirely
+        parsed_args = _fast_parse(argv)
+        if parsed_args is None:
+            parser = self.create_parser(argv)
+            parsed_args = parser.parse_args(argv)
+            if not parsed_args.command:
+                parser.print_help()
+                return 1
+            
+        configure_logging()
         try:
-            if parsed_args.command == "create":
-                success, message = self.key_manager.create_key(
-                    parsed_args.name,
-                    parsed_args.type,
-                    parsed_args.comment
-                )
-                if success and parsed_args.expiry:
-                    self.config.set_key_expiration(parsed_args.name, parsed_args.expiry)
-                print(message)
-                return 0 if success else 1
-                
-            elif parsed_args.command == "list":
-                keys = self.key_manager.list_keys()
-                if not keys:
-                    print("No SSH keys found")
-                    return 0
-                    
-                for key in keys:
-                    if parsed_args.show_details:
-                        info = self.key_manager.get_key_info(key)
-                        print(f"\nKey: {info['name']}")
-                        print(f"Type: {info['type']}")
-                        print(f"Comment: {info['comment']}")
-                        print(f"Last Used: {info['last_used']}")
-                        print(f"Permissions: {info['permissions']}")
-                        if info['expiry']:
-                            print(f"Expires: {info['expiry']}")
-                    else:
-                        print(key.name)
+            handler = getattr(self, self._HANDLERS[parsed_args.command])
+            return handler(parsed_args)
+        except Exception as e:
+            logger.error("Error executing command: %s", e)
+            print(f"Error: {str(e)}")
+            return 1
+
+    def _print_command_help(self, name: str) -> None:
+        """Print the help of a subcommand, reusing its parser if already built."""
+        if name not in self._command_parsers:
+            self.create_parser([name])
+        self._command_parsers[name].print_help()
+
+    def _print_synopsis(self) -> None:
+        """Print a short usage summary listing the available commands."""
+        lines = ["usage: keyctl [-h] [-v] <command> ...", "", "Available commands:"]
+        for name, (help_text, _) in _COMMANDS.items():
+            lines.append(f"  {name:<10}{help_text}")
+        lines.append("")
+        lines.append("Run 'keyctl <command> -h' for command options.")
+        print("\n".join(lines))
+
+    def _cmd_create(self, parsed_args: argparse.Namespace) -> int:
+        """Create a new SSH key."""
+        success, message = self.key_manager.create_key(
+            parsed_args.name,
+            parsed_args.type,
+            parsed_args.comment
+        )
+        if success and parsed_args.expiry:
+            self.config.set_key_expiration(parsed_args.name, parsed_args.expiry)
+        print(message)
+        return 0 if success else 1
+
+    def _cmd_list(self, parsed_args: argparse.Namespace) -> int:
+        """List SSH keys, optionally with details."""
+        keys = self.key_manager.list_keys()
+        if not keys:
+            print("No SSH keys found")
+            return 0
+            
+        lines = []
+        if parsed_args.show_details:
+            # One batched call reads all public keys concurrently
+            for info in self.key_manager.get_keys_info(keys):
+                lines.append(f"\nKey: {info['name']}")
+                lines.append(f"Type: {info['type']}")
+                lines.append(f"Comment: {info['comment']}")
+                lines.append(f"Last Used: {info['last_used']}")
+                if info['permissions_ok']:
+                    lines.append(f"Permissions: {info['permissions']}")
+                else:
+                    expected = format(self.key_manager.security.private_key_mode, "03o")
+                    lines.append(f"Permissions: {info['permissions']} (should be {expected})")
+                if info['expiry']:
+                    lines.append(f"Expires: {info['expiry']}")
+        else:
+            lines.extend(key.name for key in keys)
+        _write_lines(lines)
+        return 0
+
+    def _cmd_add(self, parsed_args: argparse.Namespace) -> int:
+        """Add a key to the SSH agent."""
+        key_path = self.ssh_dir / parsed_args.name
+        if self.key_manager.add_to_agent(key_path):
+            print(f"Added {parsed_args.name} to SSH agent")
+            if parsed_args.timeout:
+                # Implementation for timeout-based activation would go here
+                print(f"Key will be removed after {parsed_args.timeout} minutes")
+            return 0
+        else:
+            print(f"Failed to add {parsed_args.name} to SSH agent")
+            return 1
+
+    def _cmd_remove(self, parsed_args: argparse.Namespace) -> int:
+        """Remove one key or all keys from the SSH agent."""
+        if parsed_args.name:
+            key_path = self.ssh_dir / parsed_args.name
+            if self.key_manager.remove_from_agent(key_path):
+                print(f"Removed {parsed_args.name} from SSH agent")
+                return 0
+            else:
+                print(f"Failed to remove {parsed_args.name} from SSH agent")
+                return 1
+        else:
+            if self.key_manager.remove_from_agent():
+                print("Removed all keys from SSH agent")
                 return 0
+            else:
+                print("Failed to remove keys from SSH agent")
+                return 1
+
+    def _cmd_validate(self, parsed_args: argparse.Namespace) -> int:
+        """Validate keys with one or more providers."""
+        providers = parsed_args.provider
+        if len(providers) == 1:
+            success, message = self.key_manager.validate_key(providers[0])
+            print(message)
+            return 0 if success else 1
+            
+        results = self.key_manager.validate_keys(providers)
+        _write_lines([f"{provider}: {results[provider][1].strip()}" for provider in providers])
+        return 0 if all(success for success, _ in results.values()) else 1
+
+    def _cmd_rotate(self, parsed_args: argparse.Namespace) -> int:
+        """Rotate an SSH key."""
+        key_path = self.ssh_dir / parsed_args.name
+        success, message = self.key_manager.rotate_key(key_path)
+        print(message)
+        return 0 if success else 1
+
+    def _cmd_backup(self, parsed_args: argparse.Namespace) -> int:
+        """Back up SSH keys."""
+        backup_dir = Path(parsed_args.dir) if parsed_args.dir else None
+        success, message = self.key_manager.backup_keys(backup_dir)
+        print(message)
+        return 0 if success else 1
+
+    def _cmd_restore(self, parsed_args: argparse.Namespace) -> int:
+        """Restore SSH keys from a backup."""
+        success, message = self.key_manager.restore_keys(Path(parsed_args.backup_path))
+        print(message)
+        return 0 if success else 1
+
+    def _cmd_analyze(self, parsed_args: argparse.Namespace) -> int:
+        """Analyze the strength of one key or all keys."""
+        if parsed_args.name:
+            key_path = self.ssh_dir / parsed_args.name
+            strength_info = self.key_manager.security.check_key_strength(key_path)
+            if strength_info:
+                print(f"Analysis for {parsed_args.name}:")
+                print(strength_info)
+        else:
+            lines = []
+            keys = self.key_manager.list_keys()
+            security = self.key_manager.security
+            for key, strength_info in zip(keys, security.check_keys_strength(keys)):
+                if strength_info:
+                    lines.append(f"\nAnalysis for {key.name}:")
+                    lines.append(str(strength_info))
+            _write_lines(lines)
+        return 0
+
+    def _cmd_config(self, parsed_args: argparse.Namespace) -> int:
+        """Dispatch an SSH config subcommand."""
+        if not parsed_args.config_command:
+            self._print_command_help("config")
+            return 1
+            
+        handler = getattr(self, _CONFIG_HANDLERS[parsed_args.config_command])
+        return handler(parsed_args)
+
+    def _cmd_config_list(self, parsed_args: argparse.Namespace) -> int:
+        """List SSH config hosts."""
+        config = self.key_manager.get_ssh_config()
+        if not config:
+            print("No SSH config found")
+            return 0
+        print("\nSSH Config:")
+        for host, settings in config.items():
+            print(f"\nHost: {host}")
+            for key, value in settings.items():
+                print(f"  {key}: {value}")
+        return 0
+
+    def _cmd_config_host(self, parsed_args: argparse.Namespace) -> int:
+        """Add or update an SSH config host."""
+        success, message = self.key_manager.update_ssh_config(
+            host=parsed_args.host,
+            key=parsed_args.key,
+            user=parsed_args.user,
+            port=parsed_args.port
+        )
+        print(message)
+        return 0 if success else 1
+
+    def _cmd_config_remove(self, parsed_args: argparse.Namespace) -> int:
+        """Remove an SSH config host."""
+        success, message = self.key_manager.remove_ssh_config(parsed_args.host)
+        print(message)
+        return 0 if success else 1
+
+    def _cmd_stats(self, parsed_args: argparse.Namespace) -> int:
+        """Show usage statistics for one key or all keys."""
+        if parsed_args.name:
+            usage = self.config.get_key_usage(parsed_args.name)
+            if usage:
+                print(f"Statistics for {parsed_args.name}:")
+                print(f"First used: {usage['created']}")
+                print(f"Last used: {usage['last_used']}")
+                print(f"Use count: {usage['use_count']}")
+        else:
+            lines = ["Key Usage Statistics:"]
+            for key in self.key_manager.list_keys():
+                usage = self.config.get_key_usage(key.name)
+                if usage:
+                    lines.append(f"\nKey: {key.name}")
+                    lines.append(f"First used: {usage['created']}")
+                    lines.append(f"Last used: {usage['last_used']}")
+                    lines.append(f"Use count: {usage['use_count']}")
+            _write_lines(lines)
+        return 0
+
+    def _cmd_expire(self, parsed_args: argparse.Namespace) -> int:
+        """Dispatch a key expiration subcommand."""
+        if not parsed_args.expire_command:
+            self._print_command_help("expire")
+            return 1
+            
+        handler = getattr(self, _EXPIRE_HANDLERS[parsed_args.expire_command])
+        return handler(parsed_args)
+
+    def _cmd_expire_set(self, parsed_args: argparse.Namespace) -> int:
+        """Set a key's expiration."""
+        success, message = self.config.set_key_expiration(parsed_args.name, parsed_args.days)
+        print(message)
+        return 0 if success else 1
+
+    def _cmd_expire_remove(self, parsed_args: argparse.Namespace) -> int:
+        """Remove a key's expiration."""
+        success, message = self.config.remove_key_expiration(parsed_args.name)
+        print(message)
+        return 0 if success else 1
+
+    def _cmd_expire_check(self, parsed_args: argparse.Namespace) -> int:
+        """List keys that expire soon."""
+        expiring_keys = self.config.check_key_expirations()
+        if not expiring_keys:
+            print("No keys are expiring soon")
+            return 0
+        lines = ["\nKeys Expiring Soon:"]
+        for key_name, days_left in expiring_keys.items():
+            lines.append(f"{key_name}: {days_left} days remaining")
+        _write_lines(lines)
+        return 0
+
+    def _cmd_repo(self, parsed_args: argparse.Namespace) -> int:
+        """Dispatch a repository subcommand."""
+        if not parsed_args.repo_command:
+            self._print_command_help("repo")
+            return 1
+            
+        handler = getattr(self, _REPO_HANDLERS[parsed_args.repo_command])
+        return handler(parsed_args)
+
+    def _cmd_repo_clone(self, parsed_args: argparse.Namespace) -> int:
+        """Clone a repository using a specific or linked key."""
+        url = parsed_args.url
+        # Handle shorthand notation (e.g., owner/repo)
+        if _SHORTHAND_RE.match(url):
+            url = f"git@{parsed_args.provider}:{url}.git"
+        
+        # Use specified key or try to find linked key
+        key_name = parsed_args.key
+        if not key_name:
+            key_name = self.config.get_repo_key(url)
+        
+        if key_name:
+            # Add the key to agent temporarily
+            key_path = self.ssh_dir / key_name
+            self.key_manager.add_to_agent(key_path)
+        
+        # Clone the repository
+        try:
+            import subprocess
+            cmd = ["git", "clone", url]
+            if parsed_args.path:
+                cmd.append(parsed_args.path)
+            
+            # Output is not captured so git's progress and errors stream
+            # straight to the terminal
+            result = subprocess.run(cmd)
+            if result.returncode == 0:
+                print("Repository cloned successfully")
                 
-            elif parsed_args.command == "add":
-                key_path = Path.home() / ".ssh" / parsed_args.name
-                if self.key_manager.add_to_agent(key_path):
-                    print(f"Added {parsed_args.name} to SSH agent")
-                    if parsed_args.timeout:
-                        # Implementation for timeout-based activation would go here
-                        print(f"Key will be removed after {parsed_args.timeout} minutes")
-                    return 0
-                else:
-                    print(f"Failed to add {parsed_args.name} to SSH agent")
-                    return 1
-                    
-            elif parsed_args.command == "remove":
-                if parsed_args.name:
-                    key_path = Path.home() / ".ssh" / parsed_args.name
-                    if self.key_manager.remove_from_agent(key_path):
-                        print(f"Removed {parsed_args.name} from SSH agent")
-                        return 0
-                    else:
-                        print(f"Failed to remove {parsed_args.name} from SSH agent")
-                        return 1
-                else:
-                    if self.key_manager.remove_from_agent():
-                        print("Removed all keys from SSH agent")
-                        return 0
+                # Configure Git user if provided
+                repo_path = parsed_args.path if parsed_args.path else url.split('/')[-1].replace('.git', '')
+                status = 0
+                for setting, value in (("user.email", parsed_args.git_email),
+                                       ("user.name", parsed_args.git_name)):
+                    if not value:
+                        continue
+                    # stderr is inherited, so git explains its own failures
+                    result = subprocess.run(["git", "-C", repo_path, "config", setting, value])
+                    if result.returncode == 0:
+                        print(f"Configured Git {setting}: {value}")
                     else:
-                        print("Failed to remove keys from SSH agent")
-                        return 1
-                        
-            elif parsed_args.command == "validate":
-                success, message = self.key_manager.validate_key(parsed_args.provider)
-                print(message)
-                return 0 if success else 1
+                        print(f"Failed to configure Git {setting}: git exited with status {result.returncode}")
+                        status = 1
                 
-            elif parsed_args.command == "rotate":
-                key_path = Path.home() / ".ssh" / parsed_args.name
-                success, message = self.key_manager.rotate_key(key_path)
+                # Save the key-repo link if key was specified; the clone
+                # already succeeded, so a link failure is only a warning
+                if key_name:
+                    try:
+                        success, message = self.config.link_repo_key(url, key_name)
+                    except ValidationError as e:
+                        success, message = False, str(e)
+                    if not success:
+                        print(f"Warning: {key_name} not linked to the repository: {message}")
+                return status
+            else:
+                print(f"Failed to clone repository: git exited with status {result.returncode}")
+                return 1
+        finally:
+            # Remove the temporary key from agent
+            if key_name:
+                self.key_manager.remove_from_agent(key_path)
+
+    def _cmd_repo_link(self, parsed_args: argparse.Namespace) -> int:
+        """Link a key to a local repository's remote."""
+        try:
+            import subprocess
+            # Get the repository remote URL
+            result = subprocess.run(
+                ["git", "-C", parsed_args.repo_path, "config", "--get", "remote.origin.url"],
+                capture_output=True, text=True
+            )
+            if result.returncode == 0:
+                url = result.stdout.strip()
+                success, message = self.config.link_repo_key(url, parsed_args.key_name)
                 print(message)
                 return 0 if success else 1
-                
-            elif parsed_args.command == "backup":
-                backup_dir = parsed_args.dir if parsed_args.dir else None
-                if self.key_manager.backup_keys(backup_dir):
-                    print("Backup completed successfully")
-                    return 0
+            else:
+                print(f"Failed to get repository URL: {result.stderr}")
                 return 1
-                
-            elif parsed_args.command == "restore":
-                if self.key_manager.restore_keys(parsed_args.backup_path):
-                    print("Keys restored successfully")
-                    return 0
-                return 1
-                
-            elif parsed_args.command == "analyze":
-                if parsed_args.name:
-                    key_path = Path.home() / ".ssh" / parsed_args.name
-                    strength_info = self.key_manager.security.check_key_strength(key_path)
-                    if strength_info:
-                        print(f"Analysis for {parsed_args.name}:")
-                        print(strength_info)
-                else:
-                    for key in self.key_manager.list_keys():
-                        strength_info = self.key_manager.security.check_key_strength(key)
-                        if strength_info:
-                            print(f"\nAnalysis for {key.name}:")
-                            print(strength_info)
-                return 0
-                
-            elif parsed_args.command == "config":
-                if not parsed_args.config_command:
-                    parser.parse_args(["config", "--help"])
-                    return 1
-                    
-                if parsed_args.config_command == "list":
-                    config = self.key_manager.get_ssh_config()
-                    if not config:
-                        print("No SSH config found")
-                        return 0
-                    print("\nSSH Config:")
-                    for host, settings in config.items():
-                        print(f"\nHost: {host}")
-                        for key, value in settings.items():
-                            print(f"  {key}: {value}")
-                    return 0
-                    
-                elif parsed_args.config_command == "host":
-                    success, message = self.key_manager.update_ssh_config(
-                        host=parsed_args.host,
-                        key=parsed_args.key,
-                        user=parsed_args.user,
-                        port=parsed_args.port
-                    )
-                    print(message)
-                    return 0 if success else 1
-                    
-                elif parsed_args.config_command == "remove":
-                    success, message = self.key_manager.remove_ssh_config(parsed_args.host)
-                    print(message)
-                    return 0 if success else 1
-                    
-            elif parsed_args.command == "stats":
-                if parsed_args.name:
-                    usage = self.config.get_key_usage(parsed_args.name)
-                    if usage:
-                        print(f"Statistics for {parsed_args.name}:")
-                        print(f"First used: {usage['created']}")
-                        print(f"Last used: {usage['last_used']}")
-                        print(f"Use count: {usage['use_count']}")
-                else:
-                    print("Key Usage Statistics:")
-                    for key in self.key_manager.list_keys():
-                        usage = self.config.get_key_usage(key.name)
-                        if usage:
-                            print(f"\nKey: {key.name}")
-                            print(f"First used: {usage['created']}")
-                            print(f"Last used: {usage['last_used']}")
-                            print(f"Use count: {usage['use_count']}")
-                return 0
-                
-            elif parsed_args.command == "expire":
-                if not parsed_args.expire_command:
-                    parser.parse_args(["expire", "--help"])
-                    return 1
-                    
-                if parsed_args.expire_command == "set":
-                    success, message = self.config.set_key_expiration(parsed_args.name, parsed_args.days)
-                    print(message)
-                    return 0 if success else 1
-                    
-                elif parsed_args.expire_command == "remove":
-                    success, message = self.config.remove_key_expiration(parsed_args.name)
-                    print(message)
-                    return 0 if success else 1
-                    
-                elif parsed_args.expire_command == "check":
-                    expiring_keys = self.config.check_key_expirations()
-                    if not expiring_keys:
-                        print("No keys are expiring soon")
-                        return 0
-                    print("\nKeys Expiring Soon:")
-                    for key_name, days_left in expiring_keys.items():
-                        print(f"{key_name}: {days_left} days remaining")
-                    return 0
-                    
-            elif parsed_args.command == "repo":
-                if not parsed_args.repo_command:
-                    parser.parse_args(["repo", "--help"])
-                    return 1
-                
-                if parsed_args.repo_command == "clone":
-                    url = parsed_args.url
-                    # Handle shorthand notation (e.g., owner/repo)
-                    if "/" in url and ":" not in url and "@" not in url:
-                        url = f"git@{parsed_args.provider}:{url}.git"
-                    
-                    # Use specified key or try to find linked key
-                    key_name = parsed_args.key
-                    if not key_name:
-                        key_name = self.config.get_repo_key(url)
-                    
-                    if key_name:
-                        # Add the key to agent temporarily
-                        key_path = Path.home() / ".ssh" / key_name
-                        self.key_manager.add_to_agent(key_path)
-                    
-                    # Clone the repository
-                    try:
-                        import subprocess
-                        cmd = ["git", "clone", url]
-                        if parsed_args.path:
-                            cmd.append(parsed_args.path)
-                        
-                        result = subprocess.run(cmd, capture_output=True, text=True)
-                        if result.returncode == 0:
-                            print("Repository cloned successfully")
-                            
-                            # Configure Git user if provided
-                            repo_path = parsed_args.path if parsed_args.path else url.split('/')[-1].replace('.git', '')
-                            if parsed_args.git_email or parsed_args.git_name:
-                                if parsed_args.git_email:
-                                    subprocess.run(["git", "-C", repo_path, "config", "user.email", parsed_args.git_email])
-                                    print(f"Configured Git user.email: {parsed_args.git_email}")
-                                if parsed_args.git_name:
-                                    subprocess.run(["git", "-C", repo_path, "config", "user.name", parsed_args.git_name])
-                                    print(f"Configured Git user.name: {parsed_args.git_name}")
-                            
-                            # Save the key-repo link if key was specified
-                            if key_name:
-                                self.config.link_repo_key(url, key_name)
-                            return 0
-                        else:
-                            print(f"Failed to clone repository: {result.stderr}")
-                            return 1
-                    finally:
-                        # Remove the temporary key from agent
-                        if key_name:
-                            self.key_manager.remove_from_agent(key_path)
-                
-                elif parsed_args.repo_command == "link":
-                    try:
-                        import subprocess
-                        # Get the repository remote URL
-                        result = subprocess.run(
-                            ["git", "-C", parsed_args.repo_path, "config", "--get", "remote.origin.url"],
-                            capture_output=True, text=True
-                        )
-                        if result.returncode == 0:
-                            url = result.stdout.strip()
-                            success, message = self.config.link_repo_key(url, parsed_args.key_name)
-                            print(message)
-                            return 0 if success else 1
-                        else:
-                            print(f"Failed to get repository URL: {result.stderr}")
-                            return 1
-                    except Exception as e:
-                        print(f"Error linking repository: {e}")
-                        return 1
-                
-                elif parsed_args.repo_command == "list-links":
-                    links = self.config.get_repo_links(
-                        repo=parsed_args.repo,
-                        key=parsed_args.key
-                    )
-                    if links:
-                        print("\nRepository-Key Links:")
-                        for repo_url, key_name in links.items():
-                            print(f"{repo_url} -> {key_name}")
-                    else:
-                        print("No repository-key links found")
-                    return 0
-            
         except Exception as e:
-            logger.error(f"Error executing command: {e}")
-            print(f"Error: {str(e)}")
+            print(f"Error linking repository: {e}")
             return 1
-            
+
+    def _cmd_repo_list_links(self, parsed_args: argparse.Namespace) -> int:
+        """List repository-key links."""
+        links = self.config.get_repo_links(
+            repo=parsed_args.repo,
+            key=parsed_args.key
+        )
+        if links:
+            print("\nRepository-Key Links:")
+            for repo_url, key_name in links.items():
+                print(f"{repo_url} -> {key_name}")
+        else:
+            print("No repository-key links found")
         return 0
 
 def main():
@@ -1,5 +1,22 @@
 """Utility functions and classes for SSH key management."""
-from .config import Config
-from .logger import get_logger
+import importlib
+import sys
 
-__all__ = ["Config", "get_logger"] 
\ No newline at end of file
+from .logger import configure_logging, get_logger
+
+__all__ = ["Config", "configure_logging", "get_logger"]
+
+# Public name -> defining submodule, imported on first attribute access
+_LAZY_IMPORTS = {
+    "Config": ".config",
+}
+
+if sys.version_info >= (3, 7):
+    def __getattr__(name):
+        """Import re-exported classes on first access (PEP 562)."""
+        if name in _LAZY_IMPORTS:
+            module = importlib.import_module(_LAZY_IMPORTS[name], __name__)
+            return getattr(module, name)
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+else:
+    from .config import Config
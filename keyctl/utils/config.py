@@ -1,21 +1,216 @@
 """Configuration management for KeyCtl."""
+import atexit
+import copy
+import fcntl
 import json
 import os
+import stat
+import tempfile
+import time
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, Any, Optional, Tuple
+from typing import Dict, Any, Iterator, Optional, Set, Tuple
 from datetime import datetime, timedelta
 
-from .logger import get_logger
+from .logger import get_logger, ValidationError
+from .validation import validate_repository_url
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib
+    orjson = None
 
 logger = get_logger(__name__)
 
+# Fold usage.jsonl back into usage.json once it grows past this size
+_JOURNAL_COMPACT_BYTES = 64 * 1024
+
+# Config directories this process appended usage events to
+_journal_dirs: Set[Path] = set()
+
+
+def _timestamp() -> str:
+    """Return the local time as YYYYMMDD_HHMMSS, for backup names."""
+    now = datetime.now()
+    # Formatted from the fields directly, skipping strftime's locale lookup
+    return f"{now.year:04d}{now.month:02d}{now.day:02d}_{now.hour:02d}{now.minute:02d}{now.second:02d}"
+
+
+def _loads(data: bytes) -> Any:
+    """Decode JSON bytes, using orjson when available."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data.decode("utf-8"))
+
+
+def _dumps(obj: Any, pretty: bool = True) -> bytes:
+    """Encode an object as JSON bytes, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else None)
+    if pretty:
+        return json.dumps(obj, indent=2).encode("utf-8")
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+def _write_file(path: Path, data: bytes, mode: int = 0o600) -> None:
+    """Atomically replace ``path`` with ``data``, giving it ``mode``."""
+    # mkstemp gives every writer its own 0600 temp file beside the target
+    fd, tmp_path = tempfile.mkstemp(dir=str(path.parent), prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            if mode != 0o600:
+                os.fchmod(f.fileno(), mode)
+            f.write(data)
+        os.replace(tmp_path, str(path))
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _write_json(path: Path, obj: Any, pretty: bool = True) -> None:
+    """Atomically replace ``path`` with ``obj`` serialized as JSON (mode 0600)."""
+    _write_file(path, _dumps(obj, pretty))
+
+
+@contextmanager
+def _flocked(path: Path, operation: int) -> Iterator[None]:
+    """Hold an flock on ``path``, creating it if needed, for the block."""
+    fd = os.open(str(path), os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        fcntl.flock(fd, operation)
+        yield
+    finally:
+        os.close(fd)
+
+
+# usage.jsonl starts with a {"gen": N} header line followed by one
+# {"key", "ts"} event per line. usage.json records the journal generation
+# and byte offset it has folded in, so every event is applied exactly once,
+# even after a compaction that crashed between its two writes.
+
+def _apply_usage(usage: Dict[str, Any], key_name: str, timestamp: str) -> None:
+    """Record one use of a key in ``usage``."""
+    entry = usage.get(key_name)
+    if entry is None:
+        usage[key_name] = {
+            "created": timestamp,
+            "last_used": timestamp,
+            "use_count": 1
+        }
+    else:
+        # Appends from concurrent processes (or a stepped clock) can arrive
+        # out of order; they still count, last_used just keeps the latest
+        if timestamp > entry["last_used"]:
+            entry["last_used"] = timestamp
+        entry["use_count"] += 1
+
+
+def _read_usage_snapshot(usage_file: Path) -> Tuple[Dict[str, Any], Tuple[Optional[int], int]]:
+    """Return the snapshot's usage and the (generation, offset) it has folded."""
+    try:
+        data = _loads(usage_file.read_bytes())
+    except FileNotFoundError:
+        return {}, (None, 0)
+    if "journal" in data and "keys" in data:
+        return data["keys"], (data["journal"]["gen"], data["journal"]["offset"])
+    # Flat layout written before snapshots recorded the journal position
+    return data, (None, 0)
+
+
+def _replay_journal(journal: Path, usage: Dict[str, Any],
+                    folded: Tuple[Optional[int], int]) -> Tuple[int, int]:
+    """Apply journal events not yet folded; return the journal's (gen, size)."""
+    try:
+        data = journal.read_bytes()
+    except FileNotFoundError:
+        return 0, 0
+    gen, start = 0, 0
+    if data.startswith(b'{"gen":'):
+        start = data.find(b"\n") + 1
+        gen = _loads(data[:start])["gen"]
+    if gen == folded[0]:
+        start = max(start, folded[1])
+    for line in data[start:].splitlines():
+        try:
+            event = _loads(line)
+        except ValueError:
+            continue  # Partial line from an interrupted append
+        _apply_usage(usage, event["key"], event["ts"])
+    return gen, len(data)
+
+
+def _compact_usage(config_dir: Path) -> None:
+    """Fold the usage journal into usage.json and start a new generation."""
+    usage_file = config_dir / "usage.json"
+    journal = config_dir / "usage.jsonl"
+    # Appenders hold the lock shared, so nothing lands in the journal
+    # between reading it and replacing it
+    with _flocked(config_dir / "usage.lock", fcntl.LOCK_EX):
+        usage, folded = _read_usage_snapshot(usage_file)
+        gen, size = _replay_journal(journal, usage, folded)
+        # The snapshot names what it folded before the journal is replaced;
+        # a crash in between leaves a state that replays correctly
+        _write_json(usage_file, {"journal": {"gen": gen, "offset": size}, "keys": usage},
+                    pretty=False)
+        _write_file(journal, b'{"gen":%d}\n' % (gen + 1))
+
+
+def _compact_if_large(config_dir: Path) -> None:
+    """Compact the usage journal once it has grown past the threshold."""
+    try:
+        size = os.stat(str(config_dir / "usage.jsonl")).st_size
+    except FileNotFoundError:
+        return
+    if size > _JOURNAL_COMPACT_BYTES:
+        _compact_usage(config_dir)
+
+
+def _flush_journals() -> None:
+    """Compact, at exit, the journals this process appended to."""
+    for config_dir in _journal_dirs:
+        try:
+            _compact_if_large(config_dir)
+        except Exception as e:
+            logger.error("Error compacting usage journal: %s", e)
+
+
+atexit.register(_flush_journals)
+
+
+def _ensure_mode(path: Path, mode: int) -> None:
+    """chmod ``path`` only if its permission bits differ from ``mode``."""
+    if stat.S_IMODE(path.stat().st_mode) != mode:
+        path.chmod(mode)
+
+
+def _file_stamp(*paths: Path) -> Tuple[Optional[Tuple[int, int]], ...]:
+    """Return (mtime_ns, size) for each path, or None where it is missing."""
+    stamps = []
+    for path in paths:
+        try:
+            st = os.stat(str(path))
+            stamps.append((st.st_mtime_ns, st.st_size))
+        except FileNotFoundError:
+            stamps.append(None)
+    return tuple(stamps)
+
+
 class Config:
     """Manages configuration and persistent data for KeyCtl."""
 
+    # Replayed usage per usage.json, reused while the snapshot's and the
+    # journal's (mtime_ns, size) stamps are unchanged. Entries only ever hold
+    # what is on disk; instances get their own deep copies, so an unsaved
+    # mutation never leaks to the next
+    _cache: Dict[Path, Tuple[Tuple, Any]] = {}
+
     def __init__(self, config_dir: Optional[Path] = None):
         self.config_dir = config_dir or Path.home() / ".ssh" / ".keyctl"
         self.config_file = self.config_dir / "config.json"
         self.usage_file = self.config_dir / "usage.json"
+        self.usage_journal = self.config_dir / "usage.jsonl"
+        self.usage_lock = self.config_dir / "usage.lock"
+        self._expirations_migrated = False
         self._ensure_config_dir()
         self._load_config()
 
@@ -23,27 +218,34 @@ class Config:
         """Ensure configuration directory exists."""
         try:
             self.config_dir.mkdir(parents=True, exist_ok=True)
-            self.config_dir.chmod(0o700)  # Secure permissions
+            _ensure_mode(self.config_dir, 0o700)  # Secure permissions
         except Exception as e:
-            logger.error(f"Error creating config directory: {e}")
+            logger.error("Error creating config directory: %s", e)
             raise
 
     def _load_config(self) -> None:
         """Load configuration from file."""
         try:
-            if self.config_file.exists():
-                self.config = json.loads(self.config_file.read_text())
-            else:
+            # Not cached: parsing config.json costs less than copying it
+            try:
+                self.config = _loads(self.config_file.read_bytes())
+            except FileNotFoundError:
                 self.config = self._create_default_config()
                 self._save_config()
                 
-            if self.usage_file.exists():
-                self.usage = json.loads(self.usage_file.read_text())
+            usage_stamp = _file_stamp(self.usage_file, self.usage_journal)
+            cached = Config._cache.get(self.usage_file)
+            if cached and cached[0] == usage_stamp:
+                self.usage = copy.deepcopy(cached[1])
             else:
-                self.usage = {}
-                self._save_usage()
+                # A missing snapshot is written on the first compaction
+                # rather than on every read-only run
+                self.usage, folded = _read_usage_snapshot(self.usage_file)
+                _replay_journal(self.usage_journal, self.usage, folded)
+                # Stamped before reading, so a concurrent append forces a re-read
+                Config._cache[self.usage_file] = (usage_stamp, copy.deepcopy(self.usage))
         except Exception as e:
-            logger.error(f"Error loading configuration: {e}")
+            logger.error("Error loading configuration: %s", e)
             raise
 
     def _create_default_config(self) -> Dict[str, Any]:
@@ -71,20 +273,17 @@ class Config:
     def _save_config(self) -> None:
         """Save configuration to file."""
         try:
-            self.config_file.write_text(json.dumps(self.config, indent=4))
-            self.config_file.chmod(0o600)  # Secure permissions
+            _write_json(self.config_file, self.config)
         except Exception as e:
-            logger.error(f"Error saving configuration: {e}")
+            logger.error("Error saving configuration: %s", e)
             raise
 
-    def _save_usage(self) -> None:
-        """Save usage data to file."""
+    def flush(self) -> None:
+        """Compact the usage journal if it has grown too large."""
         try:
-            self.usage_file.write_text(json.dumps(self.usage, indent=4))
-            self.usage_file.chmod(0o600)  # Secure permissions
+            _compact_if_large(self.config_dir)
         except Exception as e:
-            logger.error(f"Error saving usage data: {e}")
-            raise
+            logger.error("Error compacting usage journal: %s", e)
 
     def get_config(self, key: str, default: Any = None) -> Any:
         """Get configuration value."""
@@ -98,16 +297,25 @@ class Config:
     def update_key_usage(self, key_name: str) -> None:
         """Update usage statistics for a key."""
         now = datetime.now().isoformat()
-        if key_name not in self.usage:
-            self.usage[key_name] = {
-                "created": now,
-                "last_used": now,
-                "use_count": 1
-            }
-        else:
-            self.usage[key_name]["last_used"] = now
-            self.usage[key_name]["use_count"] += 1
-        self._save_usage()
+        # Append one event instead of rewriting usage.json; compaction folds
+        # the journal back in at exit once it has grown large
+        line = _dumps({"key": key_name, "ts": now}, pretty=False) + b"\n"
+        try:
+            # Shared with other appenders, exclusive with a compaction
+            with _flocked(self.usage_lock, fcntl.LOCK_SH):
+                fd = os.open(str(self.usage_journal),
+                             os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+                try:
+                    os.write(fd, line)
+                finally:
+                    os.close(fd)
+        except Exception as e:
+            logger.error("Error saving usage data: %s", e)
+            raise
+        _apply_usage(self.usage, key_name, now)
+        # The cached copy predates this append; the next load re-reads
+        Config._cache.pop(self.usage_file, None)
+        _journal_dirs.add(self.config_dir)
 
     def get_key_usage(self, key_name: str) -> Optional[Dict[str, Any]]:
         """Get usage statistics for a key."""
@@ -115,12 +323,15 @@ class Config:
 
     def set_key_expiration(self, key_name: str, days: int) -> Tuple[bool, str]:
         """Set expiration for a key."""
+        if days < 1:
+            raise ValueError(f"Expiration must be at least 1 day, got {days}")
         try:
             config = self.config
             config["key_expiration"] = config.get("key_expiration", {})
             config["key_expiration"][key_name] = {
                 "days": days,
-                "set_date": datetime.now().isoformat()
+                "set_date": datetime.now().isoformat(),
+                "set_epoch": int(time.time())
             }
             self._save_config()
             return True, f"Set {days} days expiration for {key_name}"
@@ -143,24 +354,70 @@ class Config:
             logger.error(error_msg)
             return False, error_msg
             
+    def _expiration_epoch(self, expiration: Dict[str, Any]) -> int:
+        """Return when an expiration was set, migrating ISO-only entries."""
+        set_epoch = expiration.get("set_epoch")
+        if set_epoch is None:
+            set_epoch = int(datetime.fromisoformat(expiration["set_date"]).timestamp())
+            expiration["set_epoch"] = set_epoch
+            self._expirations_migrated = True
+        return set_epoch
+
+    def get_key_expiration(self, key_name: str) -> Optional[str]:
+        """Get the expiration date of a key, if one is set."""
+        expiration = self.config.get("key_expiration", {}).get(key_name)
+        if not expiration:
+            return None
+        expires_at = self._expiration_epoch(expiration) + expiration["days"] * 86400
+        return datetime.fromtimestamp(expires_at).date().isoformat()
+
     def check_key_expirations(self) -> Dict[str, int]:
         """Check which keys are expiring soon (within 30 days)."""
         try:
-            config = self.config
             expiring_keys = {}
+            now = int(time.time())
+            self._expirations_migrated = False
             
-            for key_name, expiration in config["key_expiration"].items():
-                set_date = datetime.fromisoformat(expiration["set_date"])
-                days_left = expiration["days"] - (datetime.now() - set_date).days
+            for key_name, expiration in self.config.get("key_expiration", {}).items():
+                days_elapsed = (now - self._expiration_epoch(expiration)) // 86400
+                days_left = expiration["days"] - days_elapsed
                 
                 if 0 < days_left <= 30:
                     expiring_keys[key_name] = days_left
                     
+            if self._expirations_migrated:
+                self._save_config()
             return expiring_keys
         except Exception as e:
-            logger.error(f"Error checking key expirations: {e}")
+            logger.error("Error checking key expirations: %s", e)
             return {}
 
     def get_provider_config(self, provider: str) -> Optional[Dict[str, str]]:
         """Get provider-specific configuration."""
-        return self.config["providers"].get(provider) 
\ No newline at end of file
+        # Older config files may predate the providers section
+        return self.config.get("providers", {}).get(provider)
+
+    def link_repo_key(self, repo_url: str, key_name: str) -> Tuple[bool, str]:
+        """Link a repository URL to the key used to access it."""
+        if not validate_repository_url(repo_url):
+            raise ValidationError(f"Invalid repository URL: {repo_url}")
+        try:
+            self.config.setdefault("repo_keys", {})[repo_url] = key_name
+            self._save_config()
+            return True, f"Linked {repo_url} to {key_name}"
+        except Exception as e:
+            error_msg = f"Error linking repository: {e}"
+            logger.error(error_msg)
+            return False, error_msg
+
+    def get_repo_key(self, repo_url: str) -> Optional[str]:
+        """Get the key linked to a repository URL, if any."""
+        return self.config.get("repo_keys", {}).get(repo_url)
+
+    def get_repo_links(self, repo: Optional[str] = None,
+                       key: Optional[str] = None) -> Dict[str, str]:
+        """Get repository-key links, optionally filtered by repository or key."""
+        return {
+            url: name for url, name in self.config.get("repo_keys", {}).items()
+            if (repo is None or repo in url) and (key is None or name == key)
+        }
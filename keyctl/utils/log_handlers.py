@@ -0,0 +1,78 @@
+"""Log handlers used by KeyCtl's logging setup."""
+import gzip
+import logging
+import os
+import shutil
+import stat
+from logging.handlers import RotatingFileHandler
+
+# Log file writes are batched into chunks of this size
+_LOG_BUFFER_SIZE = 64 * 1024
+# Read size used when compressing a rotated log
+_COPY_CHUNK_SIZE = 1024 * 1024
+
+class BufferedRotatingFileHandler(RotatingFileHandler):
+    """RotatingFileHandler that batches writes and gzips rotated files.
+
+    The buffer is written out when full, after ERROR and CRITICAL records,
+    on an explicit flush(), on rollover and on close (which
+    logging.shutdown() does at exit); only the per-record flush of
+    StreamHandler.emit is skipped. The file size is tracked here, in encoded
+    bytes, because the stock rollover check seeks the stream, which would
+    flush it. Rotated backups are named ``<log>.N.gz``.
+    """
+
+    _emitting = False
+    # Size of the record that triggered a rollover, counted once it is
+    # written to the new file
+    _rollover_size = 0
+
+    def _open(self):
+        stream = open(self.baseFilename, self.mode, buffering=_LOG_BUFFER_SIZE,
+                      encoding=self.encoding)
+        st = os.fstat(stream.fileno())
+        self._size = st.st_size
+        # Never rotate a FIFO or device such as /dev/null, like the stdlib
+        self._regular = stat.S_ISREG(st.st_mode)
+        return stream
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if self.stream is None:
+            self.stream = self._open()
+        if self.maxBytes > 0 and self._regular:
+            msg = "%s\n" % self.format(record)
+            size = len(msg.encode(self.stream.encoding, self.stream.errors))
+            if self._size + size >= self.maxBytes:
+                self._rollover_size = size
+                return True
+            self._size += size
+        return False
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self._emitting = True
+        try:
+            super().emit(record)
+        finally:
+            self._emitting = False
+        self._size += self._rollover_size
+        self._rollover_size = 0
+        if record.levelno >= logging.ERROR:
+            self.flush()
+
+    def flush(self) -> None:
+        # Under the lock, so a flush from another thread waits for emit()
+        self.acquire()
+        try:
+            if self.stream is not None and not self._emitting:
+                self.stream.flush()
+        finally:
+            self.release()
+
+    def rotation_filename(self, default_name: str) -> str:
+        return default_name + ".gz"
+
+    def rotate(self, source: str, dest: str) -> None:
+        # Fastest level: rotation runs inline with logging
+        with open(source, "rb") as src, gzip.open(dest, "wb", compresslevel=1) as dst:
+            shutil.copyfileobj(src, dst, length=_COPY_CHUNK_SIZE)
+        os.remove(source)
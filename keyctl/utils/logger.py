@@ -1,11 +1,17 @@
 """Logging configuration for KeyCtl."""
+import atexit
 import logging
 import sys
 from pathlib import Path
-from typing import Optional
-from logging.handlers import RotatingFileHandler
+from typing import TYPE_CHECKING, Optional
 import os
 
+if TYPE_CHECKING:
+    from logging.handlers import QueueListener
+
+# Background thread that writes queued records to the log file
+_listener: Optional["QueueListener"] = None
+
 def setup_logger(
     log_file: Optional[Path] = None,
     level: int = logging.INFO,
@@ -13,6 +19,11 @@ def setup_logger(
     backup_count: int = 3
 ) -> None:
     """Set up logging configuration with rotation."""
+    # Deferred: logging.handlers pulls in socket, pickle and threading
+    import queue
+    from logging.handlers import QueueHandler, QueueListener
+    from .log_handlers import BufferedRotatingFileHandler
+    
     # Create formatters
     file_formatter = logging.Formatter(
         '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
@@ -30,20 +41,79 @@ def setup_logger(
     handlers.append(console_handler)
     
     # File handler if log file is specified
+    file_handler = None
     if log_file:
         log_file.parent.mkdir(parents=True, exist_ok=True)
-        file_handler = RotatingFileHandler(
+        file_handler = BufferedRotatingFileHandler(
             log_file,
             maxBytes=max_size,
-            backupCount=backup_count
+            backupCount=backup_count,
+            delay=True  # Open the file on the first record, not up front
         )
         file_handler.setFormatter(file_formatter)
-        handlers.append(file_handler)
     
-    # Configure root logger
+    # Configure root logger; the console stays synchronous so log lines keep
+    # their place among printed output, while file writes go through a queue
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for old_handler in _listener.handlers:
+            old_handler.close()
+        _listener = None
     root_logger = logging.getLogger()
     root_logger.setLevel(level)
     root_logger.handlers = handlers
+    if file_handler is not None:
+        log_queue = queue.Queue(-1)
+        _listener = QueueListener(log_queue, file_handler)
+        _listener.start()
+        root_logger.addHandler(QueueHandler(log_queue))
+
+def _stop_listener() -> None:
+    """Drain queued records before logging.shutdown() closes the handlers."""
+    if _listener is not None:
+        _listener.stop()
+
+# Registered after logging's own shutdown hook, so it runs first
+atexit.register(_stop_listener)
+
+def configure_logging(verbose: bool = False, log_file: Optional[Path] = None) -> None:
+    """Attach the console and file handlers (once) before a command runs."""
+    global _configured
+    if _configured:
+        return
+    _configured = True
+    
+    if verbose:
+        level = logging.DEBUG
+    else:
+        level = getattr(logging, os.getenv('KEYCTL_LOG_LEVEL', 'INFO').upper())
+    setup_logger(
+        log_file=log_file or Path.home() / '.keyctl' / 'keyctl.log',
+        level=level
+    )
+
+def tail_log(log_file: Optional[Path] = None, n_bytes: int = 1 << 20) -> str:
+    """Return the last ``n_bytes`` of the log, starting at a line boundary.
+
+    Queued and buffered records are written out first, so the tail is
+    current.
+    """
+    log_file = log_file or Path.home() / '.keyctl' / 'keyctl.log'
+    if _listener is not None:
+        # stop() drains the queue; the handlers then write their buffers
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.flush()
+        _listener.start()
+    with open(log_file, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size <= n_bytes:
+            return f.read().decode('utf-8', 'replace')
+        f.seek(size - n_bytes)
+        data = f.read()
+    # Drop the partial line the seek landed in
+    return data[data.find(b'\n') + 1:].decode('utf-8', 'replace')
 
 def get_logger(name: str) -> logging.Logger:
     """Get a logger instance with the given name."""
@@ -70,9 +140,6 @@ class OperationError(KeyCtlError):
     """Operation-related errors."""
     pass
 
-# Initialize logger with environment-based level
-log_level = os.getenv('KEYCTL_LOG_LEVEL', 'INFO')
-setup_logger(
-    log_file=Path.home() / '.keyctl' / 'keyctl.log',
-    level=getattr(logging, log_level.upper())
-) 
\ No newline at end of file
+# Handlers are attached by configure_logging(); until then records are dropped
+_configured = False
+logging.getLogger('keyctl').addHandler(logging.NullHandler())
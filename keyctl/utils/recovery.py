@@ -1,8 +1,9 @@
 """Error recovery utilities for KeyCtl."""
+import os
 import shutil
 from pathlib import Path
 from typing import Optional
-from datetime import datetime
+from .config import _timestamp, _write_file
 from .logger import OperationError
 
 class RecoveryManager:
@@ -15,9 +16,25 @@ class RecoveryManager:
     def backup_config(self, config_path: Path) -> Path:
         """Create a backup of configuration file."""
         try:
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            backup_path = self.backup_dir / f'config_{timestamp}.json'
-            shutil.copy2(config_path, backup_path)
+            timestamp = _timestamp()
+            counter = 0
+            while True:
+                suffix = f'_{counter}' if counter else ''
+                backup_path = self.backup_dir / f'config_{timestamp}{suffix}.json'
+                counter += 1
+                try:
+                    # Claim the name; a backup from the same second is kept
+                    os.close(os.open(str(backup_path), os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o600))
+                except FileExistsError:
+                    continue
+                break
+            try:
+                # A real copy: a hard link would share the inode with a
+                # config file that may later be written in place
+                shutil.copy2(config_path, backup_path)
+            except BaseException:
+                os.unlink(str(backup_path))
+                raise
             return backup_path
         except Exception as e:
             raise OperationError(f"Error backing up config: {e}")
@@ -25,7 +42,8 @@ class RecoveryManager:
     def restore_config(self, backup_path: Path, config_path: Path) -> None:
         """Restore configuration from backup."""
         try:
-            shutil.copy2(backup_path, config_path)
+            # Swapped in atomically, like every Config write
+            _write_file(config_path, backup_path.read_bytes())
         except Exception as e:
             raise OperationError(f"Error restoring config: {e}")
     
@@ -0,0 +1,45 @@
+"""Generate scripts/keyctl.sh, a shell shim that answers --help/--version.
+
+Run from the repository root after changing the CLI or bumping the version:
+
+    python scripts/build_shim.py
+"""
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from keyctl import __version__  # noqa: E402
+from keyctl.ui.cli import CLI  # noqa: E402
+
+SHIM_PATH = Path(__file__).resolve().parent / "keyctl.sh"
+
+TEMPLATE = """#!/bin/sh
+# Generated by scripts/build_shim.py; do not edit by hand.
+# Answers --help and --version without starting Python and hands every
+# other invocation to the keyctl package.
+case "$1" in
+    -h|--help)
+        cat <<'KEYCTL_HELP'
+{help}KEYCTL_HELP
+        exit 0
+        ;;
+    -v|--version)
+        echo "keyctl {version}"
+        exit 0
+        ;;
+esac
+exec "${{KEYCTL_PYTHON:-python3}}" -m keyctl "$@"
+"""
+
+
+def main() -> None:
+    """Write the shim with the current help text and version."""
+    parser = CLI().create_parser()
+    SHIM_PATH.write_text(TEMPLATE.format(help=parser.format_help(), version=__version__))
+    SHIM_PATH.chmod(0o755)
+    print(f"Wrote {SHIM_PATH}")
+
+
+if __name__ == "__main__":
+    main()
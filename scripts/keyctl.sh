@@ -0,0 +1,42 @@
+#!/bin/sh
+# Generated by scripts/build_shim.py; do not edit by hand.
+# Answers --help and --version without starting Python and hands every
+# other invocation to the keyctl package.
+case "$1" in
+    -h|--help)
+        cat <<'KEYCTL_HELP'
+usage: keyctl [-h] [-v]
+              {create,list,add,remove,validate,rotate,backup,restore,analyze,config,stats,expire,repo}
+              ...
+
+KeyCtl - A comprehensive SSH key management tool
+
+positional arguments:
+  {create,list,add,remove,validate,rotate,backup,restore,analyze,config,stats,expire,repo}
+                        Available commands
+    create              Create a new SSH key
+    list                List all SSH keys
+    add                 Add key to SSH agent
+    remove              Remove key from SSH agent
+    validate            Validate key with provider
+    rotate              Rotate an SSH key
+    backup              Backup SSH keys
+    restore             Restore SSH keys from backup
+    analyze             Analyze key strength
+    config              Manage SSH config
+    stats               View key statistics
+    expire              Manage key expiration
+    repo                Repository management
+
+options:
+  -h, --help            show this help message and exit
+  -v, --version         show program's version number and exit
+KEYCTL_HELP
+        exit 0
+        ;;
+    -v|--version)
+        echo "keyctl 0.1.0"
+        exit 0
+        ;;
+esac
+exec "${KEYCTL_PYTHON:-python3}" -m keyctl "$@"
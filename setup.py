@@ -36,8 +36,12 @@ setup(
         "cryptography>=41.0.0",
     ],
     extras_require={
+        "fast": [
+            "orjson",
+        ],
         "dev": [
             "pytest",
+            "pytest-xdist",
             "black",
             "mypy",
             "pylint",
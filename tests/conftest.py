@@ -0,0 +1,26 @@
+"""Shared pytest configuration for the KeyCtl test suite."""
+import os
+
+import pytest # type: ignore
+
+_SHM = "/dev/shm"
+
+
+def pytest_configure(config):
+    """Keep tmp_path directories on tmpfs if possible."""
+    # Read lazily by tmp_path_factory, so setting it here is early enough;
+    # an explicit --basetemp or PYTEST_DEBUG_TEMPROOT still wins
+    if config.option.basetemp is None and os.access(_SHM, os.W_OK):
+        os.environ.setdefault("PYTEST_DEBUG_TEMPROOT", _SHM)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def session_home(tmp_path_factory):
+    """Point HOME at one temporary directory (with .ssh) for the session."""
+    home = tmp_path_factory.mktemp("home")
+    # Created with ssh's own mode, so nothing chmods it later
+    os.mkdir(str(home / ".ssh"), 0o700)
+    mp = pytest.MonkeyPatch()
+    mp.setenv("HOME", str(home))
+    yield home
+    mp.undo()